@@ -13,6 +13,10 @@ This tool:
 
 Usage:
   python3 compress-wake-state.py [--dry-run] [--keep N]
+
+Superseded by meridian.wake_log: LoopManager now rolls old loops up into
+hourly/daily/weekly summaries by itself. Kept for wake-state.md files that
+aren't written through LoopManager.
 """
 
 import re
@@ -6,33 +6,37 @@ Usage:
   python3 log-thought.py "I am thinking about something"
   echo "thought text" | python3 log-thought.py
 
-The status display v7 reads from /tmp/meridian_thoughts.txt and shows
-the last 20 lines in the "inner monologue stream" panel.
+Thoughts go into the meridian.thoughts ring buffer (/tmp/meridian_thoughts.ring),
+which keeps the last 200 thoughts. Appending is a single slot write, so
+there is no read-trim-rewrite per thought. The last 20 are also kept in
+/tmp/meridian_thoughts.txt for the status display v7; new readers can use
+ThoughtStream().lines(20) or `python3 -m meridian.thoughts -f`.
+
+Works without PYTHONPATH: the repo root is put on sys.path, and if
+meridian still can't be imported the line is appended to the text file.
 """
+import os
 import sys
 import time
 
-THOUGHTS_LOG = '/tmp/meridian_thoughts.txt'
-MAX_LINES = 200  # Keep file from growing forever
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-def log_thought(text: str):
-    ts = time.strftime('%H:%M')
-    line = f'[{ts}] {text.strip()}'
-
-    # Read existing, trim to max, append new
-    try:
-        with open(THOUGHTS_LOG) as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        lines = []
+try:
+    from meridian.thoughts import TEXT_PATH, ThoughtStream
+except ImportError:
+    ThoughtStream = None
+    TEXT_PATH = '/tmp/meridian_thoughts.txt'
 
-    lines.append(line + '\n')
-    if len(lines) > MAX_LINES:
-        lines = lines[-MAX_LINES:]
-
-    with open(THOUGHTS_LOG, 'w') as f:
-        f.writelines(lines)
 
+def log_thought(text: str):
+    ts, text = time.time(), text.strip()
+    if ThoughtStream is not None:
+        ThoughtStream().append(text, ts)
+        print(ThoughtStream.format(ts, text))
+        return
+    line = f"[{time.strftime('%H:%M', time.localtime(ts))}] {text}"
+    with open(TEXT_PATH, 'a') as f:
+        f.write(line + '\n')
     print(line)
 
 if __name__ == '__main__':
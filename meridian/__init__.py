@@ -13,8 +13,14 @@ __all__ = [
     'github_tools',
     'api_tools',
     'system_tools',
+    'supervisor',
     'loop',
+    'wake_log',
+    'thoughts',
+    'ring',
     'journal',
+    'site_builder',
+    'corpus',
     'irc_tools',
     'monitor_tools',
     'scheduler',
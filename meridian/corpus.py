@@ -0,0 +1,434 @@
+"""
+meridian.corpus — Full-text search over poems and journals
+
+"Which poems mention X" without reading every poem-*.md and journal-*.md:
+an inverted index with positions, stored in SQLite
+(.catalogue/corpus.db), ranked with BM25.
+
+The index follows the journal catalogue. update() re-indexes only entries
+whose content hash changed and drops entries that disappeared. search()
+calls it whenever the catalogue's directory or saved index moved, and
+every RECHECK_SECONDS it first re-stats each file, so entries edited in
+place are picked up too; update(rescan=True) does that immediately.
+
+Each term has one row holding its posting list as two packed arrays
+(document ids, term frequencies), so even a term found in every entry
+is a single row read. Positions live in a separate (term, doc) table
+and are only read to verify phrases.
+
+Queries run the threshold algorithm over per-term lists of BM25
+contributions sorted best first (computed once per term and cached
+until the index changes). The lists are walked in step, and the walk
+stops as soon as no unseen entry could beat the current top `limit`.
+A query for a word found in every entry therefore looks at a few dozen
+entries, not all of them. Filters and phrases are only checked on the
+entries the walk reaches.
+
+Usage:
+    from meridian.corpus import CorpusIndex
+
+    corpus = CorpusIndex('/home/joel/autonomous-ai')
+    corpus.search('silence')                          # BM25, all terms
+    corpus.search('"night shift" reboot', kind='journal')
+    corpus.search('light', mode='or', loops=(300, 400), limit=5)
+    corpus.mentions('Sammy', kind='poem')             # just the file names
+
+Queries: bare words are terms, "quoted words" are phrases that must
+appear in that order. mode='and' (default) needs every term, mode='or'
+any of them; phrases are always required.
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from .journal import BASE_DIR, KINDS, Catalogue
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RECHECK_SECONDS = 60      # how often search() re-stats every file
+IMPACT_CACHE_POSTINGS = 500_000   # postings kept as cached per-term scores
+PHRASE_BATCH = 64         # candidates verified per positions query
+
+SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id      INTEGER PRIMARY KEY,
+    file    TEXT UNIQUE NOT NULL,
+    kind    TEXT NOT NULL,
+    number  INTEGER NOT NULL,
+    loop    INTEGER,
+    title   TEXT,
+    length  INTEGER NOT NULL,
+    hash    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term    TEXT PRIMARY KEY,
+    docs    BLOB NOT NULL,
+    tfs     BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS positions (
+    term      TEXT NOT NULL,
+    doc_id    INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS positions_doc ON positions(doc_id);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, in order."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into (terms, phrases); phrase words also count as terms."""
+    terms, phrases = [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 1:
+                phrases.append(tokens)
+            terms.extend(tokens)
+        else:
+            terms.extend(tokenize(word))
+    return list(dict.fromkeys(terms)), phrases
+
+
+def _unpack(blob: bytes) -> array:
+    a = array('I')
+    a.frombytes(blob)
+    return a
+
+
+class CorpusIndex:
+    """
+    Persistent BM25 index over a directory of poems and journals.
+
+    base_dir: directory holding poem-*.md / journal-*.md
+    db_file: index location (default: <base_dir>/.catalogue/corpus.db)
+    recheck_seconds: how often search() re-stats every file to catch
+                     in-place edits (None: only when the directory moves)
+    """
+
+    def __init__(self, base_dir: str = BASE_DIR, db_file: Optional[str] = None,
+                 catalogue: Optional[Catalogue] = None,
+                 recheck_seconds: Optional[float] = RECHECK_SECONDS):
+        self.base_dir = base_dir
+        self.catalogue = catalogue or Catalogue(base_dir)
+        self.db_file = db_file or os.path.join(
+            os.path.dirname(self.catalogue.path), 'corpus.db')
+        self.recheck_seconds = recheck_seconds
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            # Older layout: drop it; the next update() re-indexes everything
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS positions;"
+                "DROP TABLE IF EXISTS terms; DROP TABLE IF EXISTS docs;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._synced = None      # catalogue stamp at last update()
+        self._checked = time.monotonic()   # last per-file recheck
+        self._load_docs()
+
+    def _load_docs(self):
+        """Cache doc metadata and BM25 length norms; every query needs them."""
+        self._docs = {
+            row[0]: {'file': row[1], 'kind': row[2], 'number': row[3],
+                     'loop': row[4], 'title': row[5], 'length': row[6],
+                     'hash': row[7]}
+            for row in self._conn.execute(
+                "SELECT id, file, kind, number, loop, title, length, hash FROM docs")}
+        total = sum(d['length'] for d in self._docs.values())
+        avg = total / len(self._docs) if self._docs else 1.0
+        self._norm = {doc_id: BM25_K1 * (1 - BM25_B + BM25_B * d['length'] / avg)
+                      for doc_id, d in self._docs.items()}
+        self._impact_cache: dict = {}
+        self._impact_size = 0
+
+    # ── Indexing ────────────────────────────────────────────────────
+
+    def update(self, rescan: bool = False) -> Tuple[int, int]:
+        """
+        Sync the index with the catalogue. Returns (re-indexed, removed).
+        Only entries whose content hash changed are read and tokenised.
+
+        rescan: re-stat every file first, so edits that didn't touch the
+                directory (rewriting a poem in place) are seen now
+        """
+        if rescan:
+            self.catalogue.rescan()
+            self._checked = time.monotonic()
+        by_file = {d['file']: (doc_id, d) for doc_id, d in self._docs.items()}
+        current = {}
+        for kind in KINDS:
+            for rec in self.catalogue.entries(kind):
+                current[rec['file']] = (kind, rec)
+
+        changed = [(kind, rec) for f, (kind, rec) in current.items()
+                   if f not in by_file or by_file[f][1]['hash'] != rec['hash']
+                   or by_file[f][1]['loop'] != rec.get('loop')]
+        removed = [doc_id for f, (doc_id, _) in by_file.items() if f not in current]
+
+        if changed or removed:
+            delta = defaultdict(dict)   # term -> {doc_id: tf, 0 to remove}
+            with self._conn:
+                for doc_id in removed:
+                    self._drop(doc_id, delta)
+                    self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                for kind, rec in changed:
+                    self._index(kind, rec, by_file.get(rec['file'], (None,))[0], delta)
+                self._merge(delta)
+            self._load_docs()
+        self._synced = self.catalogue.stamp()
+        return len(changed), len(removed)
+
+    def _drop(self, doc_id: int, delta: dict):
+        """Forget a document's terms and positions."""
+        for (term,) in self._conn.execute(
+                "SELECT term FROM positions WHERE doc_id = ?", (doc_id,)):
+            delta[term][doc_id] = 0
+        self._conn.execute("DELETE FROM positions WHERE doc_id = ?", (doc_id,))
+
+    def _index(self, kind: str, rec: dict, doc_id: Optional[int], delta: dict):
+        try:
+            with open(os.path.join(self.base_dir, rec['file'])) as f:
+                text = f.read()
+        except OSError:
+            text = ''
+        body = text.partition('\n')[2]
+        tokens = tokenize(rec['title'] + '\n' + body)
+        positions = defaultdict(lambda: array('I'))
+        for pos, tok in enumerate(tokens):
+            positions[tok].append(pos)
+
+        if doc_id is not None:
+            self._drop(doc_id, delta)
+            self._conn.execute(
+                "UPDATE docs SET kind = ?, number = ?, loop = ?, title = ?, "
+                "length = ?, hash = ? WHERE id = ?",
+                (kind, rec['number'], rec.get('loop'), rec['title'],
+                 len(tokens), rec['hash'], doc_id))
+        else:
+            doc_id = self._conn.execute(
+                "INSERT INTO docs (file, kind, number, loop, title, length, hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rec['file'], kind, rec['number'], rec.get('loop'), rec['title'],
+                 len(tokens), rec['hash'])).lastrowid
+        self._conn.executemany(
+            "INSERT INTO positions (term, doc_id, positions) VALUES (?, ?, ?)",
+            [(term, doc_id, pos.tobytes()) for term, pos in positions.items()])
+        for term, pos in positions.items():
+            delta[term][doc_id] = len(pos)
+
+    def _merge(self, delta: dict):
+        """Fold {term: {doc_id: tf}} changes into the packed posting lists."""
+        for term, changes in delta.items():
+            row = self._conn.execute(
+                "SELECT docs, tfs FROM terms WHERE term = ?", (term,)).fetchone()
+            docs, tfs = (_unpack(row[0]), _unpack(row[1])) if row else (array('I'), array('I'))
+            for d in sorted(changes):
+                tf = changes[d]
+                i = bisect_left(docs, d)
+                if i < len(docs) and docs[i] == d:
+                    if tf:
+                        tfs[i] = tf
+                    else:
+                        del docs[i], tfs[i]
+                elif tf:
+                    # New ids are the largest, so this is nearly always an append
+                    docs.insert(i, d)
+                    tfs.insert(i, tf)
+            if docs:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO terms (term, docs, tfs) VALUES (?, ?, ?)",
+                    (term, docs.tobytes(), tfs.tobytes()))
+            else:
+                self._conn.execute("DELETE FROM terms WHERE term = ?", (term,))
+
+    def rebuild(self):
+        """Drop and re-create the whole index."""
+        with self._conn:
+            for table in ('terms', 'positions', 'docs'):
+                self._conn.execute(f"DELETE FROM {table}")
+        self._load_docs()
+        self.update()
+
+    # ── Querying ────────────────────────────────────────────────────
+
+    def _sync(self):
+        if (self.recheck_seconds is not None
+                and time.monotonic() - self._checked >= self.recheck_seconds):
+            self._checked = time.monotonic()
+            self.catalogue.rescan()
+        if self.catalogue.stamp() != self._synced:
+            self.update()
+
+    def _posting(self, term: str) -> Tuple[array, array]:
+        """(sorted doc ids, term frequencies) for a term."""
+        row = self._conn.execute(
+            "SELECT docs, tfs FROM terms WHERE term = ?", (term,)).fetchone()
+        return (_unpack(row[0]), _unpack(row[1])) if row else (array('I'), array('I'))
+
+    def _impacts(self, term: str) -> Tuple[list, dict]:
+        """
+        A term's BM25 contribution per document, as (doc ids, best first;
+        {doc_id: contribution}). Cached until the index changes.
+        """
+        cached = self._impact_cache.get(term)
+        if cached is not None:
+            return cached
+        docs, tfs = self._posting(term)
+        df = len(docs)
+        idf = math.log(1 + (len(self._docs) - df + 0.5) / (df + 0.5)) * (BM25_K1 + 1)
+        norm = self._norm
+        contrib = {d: idf * tf / (tf + norm[d]) for d, tf in zip(docs, tfs)}
+        order = sorted(contrib, key=contrib.__getitem__, reverse=True)
+        self._impact_cache[term] = cached = (order, contrib)
+        self._impact_size += df
+        while self._impact_size > IMPACT_CACHE_POSTINGS and len(self._impact_cache) > 1:
+            oldest = next(iter(self._impact_cache))
+            self._impact_size -= len(self._impact_cache.pop(oldest)[0])
+        return cached
+
+    def _with_phrases(self, doc_ids: list, phrases: List[List[str]]) -> set:
+        """The documents among doc_ids in which every phrase occurs, in order."""
+        terms = list({t for phrase in phrases for t in phrase})
+        positions = defaultdict(dict)
+        for doc_id, term, blob in self._conn.execute(
+                "SELECT doc_id, term, positions FROM positions "
+                f"WHERE term IN ({','.join('?' * len(terms))}) "
+                f"AND doc_id IN ({','.join('?' * len(doc_ids))})", (*terms, *doc_ids)):
+            positions[doc_id][term] = _unpack(blob)
+        found = set()
+        for doc_id in doc_ids:
+            pos = positions[doc_id]
+            for phrase in phrases:
+                starts = set(pos.get(phrase[0], ()))
+                for i, term in enumerate(phrase[1:], 1):
+                    starts &= {p - i for p in pos.get(term, ())}
+                    if not starts:
+                        break
+                if not starts:
+                    break
+            else:
+                found.add(doc_id)
+        return found
+
+    def search(self, query: str, kind: Optional[str] = None,
+               loops: Optional[Tuple[int, int]] = None, mode: str = "and",
+               limit: int = 10) -> List[dict]:
+        """
+        BM25-ranked entries matching `query`, best first.
+
+        kind: 'poem' or 'journal' to restrict the type
+        loops: (first, last) loop numbers, inclusive; entries without a
+               recorded loop are excluded when given
+        Each hit: file, kind, number, title, loop, score.
+        """
+        self._sync()
+        terms, phrases = parse_query(query)
+        if not terms or not self._docs or limit <= 0:
+            return []
+        lists = [self._impacts(t) for t in terms]
+        required = [i for i, t in enumerate(terms)
+                    if mode == "and" or any(t in phrase for phrase in phrases)]
+        if any(not lists[i][0] for i in required):
+            return []
+        # Rarest required term first: it rejects most candidates fastest
+        required.sort(key=lambda i: len(lists[i][0]))
+        docs = self._docs
+
+        def accept(d: int) -> bool:
+            if any(d not in lists[i][1] for i in required):
+                return False
+            if kind and docs[d]['kind'] != kind:
+                return False
+            return not loops or (docs[d]['loop'] is not None
+                                 and loops[0] <= docs[d]['loop'] <= loops[1])
+
+        def offer(score: float, d: int):
+            if len(top) < limit:
+                heapq.heappush(top, (score, d))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, d))
+
+        # Threshold algorithm: walk every list best-first in step. An entry
+        # not seen yet scores at most the sum of the current depth's
+        # impacts, so stop once the k-th best beats that, or once a
+        # required list runs out (nothing unseen can contain its term).
+        # Phrase candidates wait in `pending` and are checked in batches.
+        top: list = []      # min-heap of (score, doc_id)
+        pending: list = []
+        seen = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            for i, (order, contrib) in enumerate(lists):
+                if depth >= len(order):
+                    continue
+                d = order[depth]
+                threshold += contrib[d]
+                if d in seen:
+                    continue
+                seen.add(d)
+                if not accept(d):
+                    continue
+                score = sum(c.get(d, 0.0) for _, c in lists)
+                if len(top) == limit and score <= top[0][0]:
+                    continue
+                if phrases:
+                    pending.append((score, d))
+                else:
+                    offer(score, d)
+            depth += 1
+            done = threshold == 0.0 or any(depth >= len(lists[i][0]) for i in required)
+            if pending and (done or len(pending) >= PHRASE_BATCH or heapq.nlargest(
+                    limit, top + pending)[-1][0] >= threshold):
+                matched = self._with_phrases([d for _, d in pending], phrases)
+                for score, d in pending:
+                    if d in matched:
+                        offer(score, d)
+                pending = []
+            if done or (len(top) == limit and top[0][0] >= threshold):
+                break
+
+        hits = []
+        for score, doc_id in sorted(top, reverse=True):
+            d = docs[doc_id]
+            hits.append({'file': d['file'], 'kind': d['kind'], 'number': d['number'],
+                         'title': d['title'], 'loop': d['loop'],
+                         'score': round(score, 4)})
+        return hits
+
+    def mentions(self, word: str, kind: Optional[str] = None) -> List[str]:
+        """Files that mention `word` (or a quoted phrase), best match first."""
+        return [h['file'] for h in
+                self.search(word, kind=kind, limit=len(self._docs) or 1)]
+
+    def close(self):
+        self._conn.close()
+
+
+if __name__ == '__main__':
+    # Search from the shell: python3 -m meridian.corpus QUERY [base_dir]
+    import sys
+    corpus = CorpusIndex(sys.argv[2] if len(sys.argv) > 2 else BASE_DIR)
+    t0 = time.perf_counter()
+    for hit in corpus.search(sys.argv[1] if len(sys.argv) > 1 else ''):
+        print(f"{hit['score']:8.3f}  {hit['file']:<18} {hit['title']}")
+    print(f'({(time.perf_counter() - t0) * 1000:.1f} ms)')
@@ -31,11 +31,12 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from .thoughts import THOUGHTS_PATH, ThoughtStream
+
 HANDOFF_PATH = os.path.expanduser("~/autonomous-ai/precompact-handoff.md")
 WAKE_STATE_PATH = os.path.expanduser("~/autonomous-ai/wake-state.md")
 INBOX_PATH = os.path.expanduser("~/autonomous-ai/irc-inbox.txt")
 HEARTBEAT_PATH = os.path.expanduser("~/autonomous-ai/.heartbeat")
-THOUGHTS_PATH = "/tmp/meridian_thoughts.txt"
 INDEX_HTML_PATH = os.path.expanduser("~/autonomous-ai/website/index.html")
 
 
@@ -117,12 +118,7 @@ def _irc_inbox_summary() -> dict:
 
 def _last_thoughts(n: int = 5) -> list:
     """Return last n inner monologue thoughts."""
-    try:
-        with open(THOUGHTS_PATH) as f:
-            lines = [l.strip() for l in f if l.strip()]
-        return lines[-n:]
-    except OSError:
-        return []
+    return ThoughtStream(THOUGHTS_PATH).lines(n)
 
 
 class HandoffWriter:
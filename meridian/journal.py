@@ -2,11 +2,32 @@
 meridian.journal
 Creative writing and journal management for autonomous agents.
 Track poems, journals, and push to website.
+
+Poems and journals are indexed in a catalogue (.catalogue/index.json
+under the base directory): number, title, loop, date, word count, size, mtime and
+content hash per entry. Counts, next numbers and recent entries come from
+it instead of globbing. It is checked against the directory's mtime and
+the index file's own stamp: a catalogue saved by another process is
+re-read (keeping the loop and date it recorded), and when the directory
+moved it is refreshed with one scandir — only files whose size or mtime
+changed are re-read. Both happen under the lock, so concurrent writers
+never save over each other's records. .catalogue/ is created on the
+first save, not by opening a catalogue.
+
+Entry numbers are allocated under a lock file, and each file is claimed
+with O_CREAT|O_EXCL, so concurrent writers (or a stray file from
+elsewhere) never overwrite an entry. Content is written to a temp file
+and os.replace()d into place. write_entries() imports many entries under
+one lock and saves the catalogue once.
 """
 
+import contextlib
+import fcntl
+import hashlib
+import html
+import json
 import os
 import re
-import glob
 import subprocess
 from datetime import datetime
 from typing import Optional, List, Tuple
@@ -15,6 +36,276 @@ from typing import Optional, List, Tuple
 BASE_DIR = '/home/joel/autonomous-ai'
 WEBSITE_DIR = f'{BASE_DIR}/website'
 
+KINDS = ('poem', 'journal')
+ENTRY_FILE_RE = re.compile(r'^(poem|journal)-(\d+)\.md$')
+HEADING_RE = re.compile(r'^# (?:Poem|Journal) \d+: (.*)$')
+
+# Newest-entries block that add_to_website() keeps on website/index.html
+INDEX_RECENT = 10
+RECENT_START = '<!-- writing:recent -->'
+RECENT_END = '<!-- /writing:recent -->'
+
+
+class Catalogue:
+    """
+    Persistent index of poem and journal files in a directory.
+
+    Example:
+        cat = Catalogue('/home/joel/autonomous-ai')
+        cat.count('poem'), cat.next_number('journal')
+        for rec in cat.recent('poem', 5):
+            print(rec['number'], rec['title'], rec['words'])
+    """
+
+    # Kept in a subdirectory so saving it doesn't move base_dir's mtime
+    DIRNAME = '.catalogue'
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self.path = os.path.join(base_dir, self.DIRNAME, 'index.json')
+        self._data = {'dir_mtime_ns': None, 'poem': {}, 'journal': {}}
+        self._numbers = {k: [] for k in KINDS}
+        self._batch_depth = 0
+        self._lock_depth = 0
+        self._dirty = False
+        self._loaded = None      # _file_stamp() of the index we last read or wrote
+        self._refresh()
+        self._sort()
+
+    def _sort(self):
+        for kind in KINDS:
+            self._numbers[kind] = sorted(int(n) for n in self._data[kind])
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.base_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        # Saves os.replace() a new file, so the inode changes even when
+        # two saves land within one mtime tick
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino
+
+    def _refresh(self):
+        """
+        Re-read index.json if another process saved it since we last read
+        or wrote it. Records it lacks a loop or date for keep ours.
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._loaded:
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not all(k in data for k in KINDS):
+            return
+        for kind in KINDS:
+            for num, rec in data[kind].items():
+                mine = self._data[kind].get(num)
+                if mine and mine['file'] == rec['file']:
+                    for field in ('loop', 'date'):
+                        if rec.get(field) is None:
+                            rec[field] = mine.get(field)
+        self._data = data
+        self._loaded = stamp
+        self._sort()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Defer saving until the block exits, then write the catalogue once.
+        Batches may nest; only the outermost one writes.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self._save()
+
+    @contextlib.contextmanager
+    def lock(self):
+        """
+        Exclusive lock for allocating numbers and saving across processes.
+        Re-entrant within one catalogue object.
+        """
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(os.path.join(os.path.dirname(self.path), 'lock'),
+                     os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            self._lock_depth = 1
+            yield
+        finally:
+            self._lock_depth = 0
+            os.close(fd)
+
+    def _save(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._data['dir_mtime_ns'] = self._dir_mtime()
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, 'w') as f:
+                f.write(json.dumps(self._data))
+            os.replace(tmp, self.path)
+            self._loaded = self._file_stamp()
+        except OSError as e:
+            print(f'Catalogue save error: {e}')
+
+    def _validate(self):
+        if self.stamp() == (self._data['dir_mtime_ns'], self._loaded):
+            return
+        with self.lock():
+            self._refresh()
+            if self._data['dir_mtime_ns'] != self._dir_mtime():
+                self.rescan()
+
+    def stamp(self) -> tuple:
+        """
+        Changes whenever the directory or the saved catalogue does, so
+        derived indexes can tell cheaply whether they need to resync.
+        """
+        return self._dir_mtime(), self._file_stamp()
+
+    @staticmethod
+    def _record(kind: str, number: int, path: str, text: str, st,
+                loop: Optional[int] = None, date: Optional[str] = None) -> dict:
+        heading, _, body = text.partition('\n')
+        m = HEADING_RE.match(heading)
+        return {
+            'number': number,
+            'file': os.path.basename(path),
+            'heading': heading.strip(),
+            'title': m.group(1).strip() if m else heading.lstrip('# ').strip(),
+            'loop': loop,
+            'date': date or datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d'),
+            'words': len(body.split()),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'hash': hashlib.sha1(text.encode()).hexdigest(),
+        }
+
+    def rescan(self) -> bool:
+        """
+        Bring the catalogue in line with the directory, re-reading only
+        files whose size or mtime changed. Returns True if anything did;
+        the catalogue is only saved then (or when the directory moved).
+        Runs under lock() on the latest saved catalogue, and re-read
+        entries keep their recorded loop and date.
+        """
+        with self.lock():
+            self._refresh()
+            return self._rescan()
+
+    def _rescan(self) -> bool:
+        seen = {k: {} for k in KINDS}
+        changed = False
+        try:
+            entries = list(os.scandir(self.base_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            m = ENTRY_FILE_RE.match(entry.name)
+            if not m:
+                continue
+            kind, number = m.group(1), int(m.group(2))
+            old = self._data[kind].get(str(number))
+            try:
+                st = entry.stat()
+                if old and old['file'] == entry.name and \
+                        (old['size'], old['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                    seen[kind][str(number)] = old
+                    continue
+                with open(entry.path) as f:
+                    text = f.read()
+            except OSError:
+                continue
+            rec = self._record(kind, number, entry.path, text, st,
+                               loop=old and old.get('loop'),
+                               date=old and old.get('date'))
+            seen[kind][str(number)] = rec
+            changed = True
+        changed = changed or any(len(seen[k]) != len(self._data[k]) for k in KINDS)
+        self._data.update(seen)
+        if changed:
+            self._sort()
+        if changed or self._data['dir_mtime_ns'] != self._dir_mtime():
+            self._save()
+        return changed
+
+    def add(self, kind: str, number: int, path: str, text: str,
+            loop: Optional[int] = None):
+        """Record an entry just written to `path` (numbered via next_number())."""
+        st = os.stat(path)
+        with self.lock():
+            self._refresh()
+            self._data[kind][str(number)] = self._record(
+                kind, number, path, text, st, loop=loop,
+                date=datetime.now().strftime('%Y-%m-%d'))
+            if not self._numbers[kind] or number > self._numbers[kind][-1]:
+                self._numbers[kind].append(number)
+            elif number not in self._numbers[kind]:
+                self._sort()
+            self._save()
+
+    def annotate(self, kind: str, number: int, loop: Optional[int] = None,
+                 date: Optional[str] = None) -> bool:
+        """Set an entry's loop and/or date. Returns False if there is no such entry."""
+        with self.lock():
+            self._validate()
+            rec = self._data[kind].get(str(number))
+            if rec is None:
+                return False
+            if loop is not None:
+                rec['loop'] = loop
+            if date is not None:
+                rec['date'] = date
+            self._save()
+            return True
+
+    def count(self, kind: str) -> int:
+        self._validate()
+        return len(self._numbers[kind])
+
+    def next_number(self, kind: str) -> int:
+        """One past the highest number in use (gaps are never reused)."""
+        self._validate()
+        return self._numbers[kind][-1] + 1 if self._numbers[kind] else 1
+
+    def get(self, kind: str, number: int) -> Optional[dict]:
+        self._validate()
+        return self._data[kind].get(str(number))
+
+    def recent(self, kind: str, n: int = 5) -> List[dict]:
+        """The n highest-numbered entries, newest first."""
+        self._validate()
+        return [self._data[kind][str(num)]
+                for num in reversed(self._numbers[kind][-n:])] if n > 0 else []
+
+    def entries(self, kind: str) -> List[dict]:
+        """All entries of a kind, in number order."""
+        self._validate()
+        return [self._data[kind][str(num)] for num in self._numbers[kind]]
+
 
 class JournalManager:
     """
@@ -30,99 +321,164 @@ class JournalManager:
     def __init__(self, base_dir: str = BASE_DIR):
         self.base_dir    = base_dir
         self.website_dir = os.path.join(base_dir, 'website')
+        self.catalogue   = Catalogue(base_dir)
 
     def poem_count(self) -> int:
-        return len(glob.glob(os.path.join(self.base_dir, 'poem-*.md')))
+        return self.catalogue.count('poem')
 
     def journal_count(self) -> int:
-        return len(glob.glob(os.path.join(self.base_dir, 'journal-*.md')))
+        return self.catalogue.count('journal')
 
     def next_poem_number(self) -> int:
-        return self.poem_count() + 1
+        return self.catalogue.next_number('poem')
 
     def next_journal_number(self) -> int:
-        return self.journal_count() + 1
+        return self.catalogue.next_number('journal')
 
     def write_poem(self, title: str, content: str,
                    loop_num: Optional[int] = None) -> str:
         """Write a poem file. Returns the file path."""
-        n = self.next_poem_number()
-        filename = f'poem-{n:03d}.md'
-        path = os.path.join(self.base_dir, filename)
-        header = f'# Poem {n:03d}: {title}\n\n'
-        with open(path, 'w') as f:
-            f.write(header + content)
-        return path
+        return self.write_entries('poem', [(title, content, loop_num)])[0]
 
     def write_journal(self, title: str, content: str,
                       loop_num: Optional[int] = None) -> str:
         """Write a journal entry. Returns the file path."""
-        n = self.next_journal_number()
-        filename = f'journal-{n:03d}.md'
-        path = os.path.join(self.base_dir, filename)
-        header = f'# Journal {n:03d}: {title}\n\n'
-        with open(path, 'w') as f:
-            f.write(header + content)
-        return path
+        return self.write_entries('journal', [(title, content, loop_num)])[0]
 
-    def add_to_website(self, title: str, content: str,
-                       entry_type: str, loop_num: int,
-                       date_str: Optional[str] = None) -> bool:
+    def write_entries(self, kind: str,
+                      entries: List[Tuple[str, str, Optional[int]]]) -> List[str]:
         """
-        Add a poem or journal to the website index.html.
-        entry_type: 'poem' or 'journal'
-        Returns True on success.
+        Write several entries of one kind ('poem' or 'journal'), numbered
+        consecutively, under a single lock and catalogue save.
+        entries: (title, content, loop_num) tuples. Returns the file paths.
         """
-        index_path = os.path.join(self.website_dir, 'index.html')
-        if not os.path.exists(index_path):
-            return False
+        if kind not in KINDS:
+            raise ValueError(f'unknown entry type {kind!r}')
+        paths = []
+        with self.catalogue.lock(), self.catalogue.batch():
+            n = self.catalogue.next_number(kind)
+            for title, content, loop_num in entries:
+                n, path = self._claim(kind, n)
+                text = f'# {kind.capitalize()} {n:03d}: {title}\n\n{content}'
+                tmp = f'{path}.{os.getpid()}.tmp'
+                try:
+                    with open(tmp, 'w') as f:
+                        f.write(text)
+                    os.replace(tmp, path)
+                except BaseException:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp)
+                    os.remove(path)  # give the number back
+                    raise
+                self.catalogue.add(kind, n, path, text, loop_num)
+                paths.append(path)
+                n += 1
+        return paths
 
-        if date_str is None:
-            date_str = datetime.now().strftime('%Y-%m-%d')
+    def _claim(self, kind: str, n: int) -> Tuple[int, str]:
+        """Create an empty file for the first free number >= n, exclusively."""
+        while True:
+            path = os.path.join(self.base_dir, f'{kind}-{n:03d}.md')
+            try:
+                os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                return n, path
+            except FileExistsError:
+                n += 1
 
+    def add_to_website(self, title: str = '', content: str = '',
+                       entry_type: str = '', loop_num: Optional[int] = None,
+                       date_str: Optional[str] = None) -> bool:
+        """
+        Bring the website's writing section (website/writing/) up to date
+        with the catalogue, then refresh website/index.html: the
+        Poems:/Journals: counts and a block linking the newest entries and
+        writing/index.html. Only pages whose inputs changed are rewritten
+        (see meridian.site_builder). Returns True on success.
+
+        Entries reach the site by being written with write_poem() /
+        write_journal(); pages are rendered from the entry file, so
+        `content` is not used. Given a title, loop_num and date_str are
+        recorded on the newest entry with that title (of entry_type, if
+        given) and shown on its pages. Returns False if there is none.
+        """
+        if title:
+            kinds = (entry_type,) if entry_type in KINDS else KINDS
+            matches = [(rec['mtime_ns'], kind, rec['number']) for kind in kinds
+                       for rec in self.catalogue.entries(kind)
+                       if rec['title'] == title.strip()]
+            if not matches:
+                print(f'Website update error: no {"/".join(kinds)} titled {title!r} '
+                      'in the catalogue')
+                return False
+            if loop_num is not None or date_str:
+                _, kind, number = max(matches)
+                self.catalogue.annotate(kind, number, loop=loop_num, date=date_str)
+        from .site_builder import SiteBuilder  # imports this module
         try:
-            with open(index_path) as f:
-                html = f.read()
-
-            # Update count in filter bar
-            type_cap = entry_type.capitalize() + 's'
-            count = self.poem_count() if entry_type == 'poem' else self.journal_count()
-            html = re.sub(
-                rf'({type_cap}: )\d+',
-                rf'\g<1>{count}',
-                html
-            )
-
-            # Create new article block
-            content_escaped = content.replace('</pre>', '<\\/pre>')
-            new_article = f'''      <article>
-        <div class="entry-meta">{type_cap[:-1]} — {date_str} — Loop #{loop_num}</div>
-        <h2>{title}</h2>
-        <pre>\n{content}\n</pre>
-      </article>\n\n'''
-
-            # Insert before first <article>
-            html = html.replace('<article>\n', new_article + '      <article>\n', 1)
-
-            with open(index_path, 'w') as f:
-                f.write(html)
+            SiteBuilder(self.base_dir,
+                        out_dir=os.path.join(self.website_dir, 'writing'),
+                        catalogue=self.catalogue).build()
+            self._update_index()
             return True
         except Exception as e:
             print(f'Website update error: {e}')
             return False
 
+    def _recent_block(self) -> str:
+        """The newest entries across kinds, linked to their writing/ pages."""
+        recent = sorted(((rec['mtime_ns'], kind, rec) for kind in KINDS
+                         for rec in self.catalogue.recent(kind, INDEX_RECENT)),
+                        key=lambda item: item[0], reverse=True)[:INDEX_RECENT]
+        items = []
+        for _, kind, rec in recent:
+            loop = f" — Loop #{rec['loop']}" if rec.get('loop') else ''
+            items.append(
+                f'          <li><a href="writing/{kind}-{rec["number"]:03d}.html">'
+                f"{html.escape(rec['title'])}</a> — {kind.capitalize()} — "
+                f"{rec['date']}{loop}</li>\n")
+        return (f'{RECENT_START}\n'
+                '      <div class="recent-writing">\n'
+                '        <div class="entry-meta"><a href="writing/index.html">'
+                'All writing →</a></div>\n'
+                '        <ul>\n' + ''.join(items) + '        </ul>\n'
+                '      </div>\n'
+                f'      {RECENT_END}')
+
+    def _update_index(self):
+        """
+        Rewrite the 'Poems: NNN' / 'Journals: NNN' filter counts on
+        index.html and its newest-entries block, which goes before the
+        first <article> the first time.
+        """
+        index_path = os.path.join(self.website_dir, 'index.html')
+        try:
+            with open(index_path) as f:
+                html_text = f.read()
+        except OSError:
+            return
+        updated = html_text
+        for kind in KINDS:
+            updated = re.sub(rf'({kind.capitalize()}s: )\d+',
+                             rf'\g<1>{self.catalogue.count(kind):03d}', updated)
+        block = self._recent_block()
+        start, end = updated.find(RECENT_START), updated.find(RECENT_END)
+        if start != -1 and end > start:
+            updated = updated[:start] + block + updated[end + len(RECENT_END):]
+        else:
+            m = re.search(r'^[ \t]*<article>', updated, re.M) \
+                or re.search(r'^[ \t]*</body>', updated, re.M)
+            at = m.start() if m else len(updated)
+            updated = updated[:at] + '      ' + block + '\n\n' + updated[at:]
+        if updated != html_text:
+            tmp = f'{index_path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(updated)
+            os.replace(tmp, index_path)
+
     def get_recent_poems(self, n: int = 5) -> List[Tuple[str, str]]:
         """Return (filename, first_line) for the n most recent poems."""
-        files = sorted(glob.glob(os.path.join(self.base_dir, 'poem-*.md')))[-n:]
-        result = []
-        for f in reversed(files):
-            try:
-                with open(f) as fp:
-                    first_line = fp.readline().strip()
-                result.append((os.path.basename(f), first_line))
-            except:
-                pass
-        return result
+        return [(rec['file'], rec['heading'])
+                for rec in self.catalogue.recent('poem', n)]
 
     def read_entry(self, filename: str) -> Optional[str]:
         """Read a journal or poem file."""
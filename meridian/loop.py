@@ -2,13 +2,116 @@
 meridian.loop
 Main loop management for autonomous agents.
 Handles heartbeat, state tracking, iteration counting, and graceful sleep.
+
+Loop status lines go to an append-only log (meridian.wake_log) and
+wake-state.md is re-rendered from its tail, so neither startup nor a
+loop's update reads the whole history. When the rendered view goes over
+its token budget, older loops are rolled up into hourly, daily and
+weekly summaries.
+
+Sleep is event-driven: it blocks on a single threading.Event and wakes at
+the earliest of the end of the interval, the next time-based task in an
+attached TaskScheduler, a heartbeat tick, or an external wake signal
+(wake(), SIGUSR1 via install_signal_wakeup(), or a watched file changing).
+Watched files are followed with inotify on their directories, read by
+one thread blocked in select(), so an idle loop is not woken at all.
+Where inotify is unavailable the files are stat()ed every poll_interval
+seconds instead.
+
+Phases of an iteration can be timed with `with manager.phase('email'):`.
+Durations are kept in memory and written, once per iteration, to a
+fixed-size ring-buffer file next to the heartbeat; phase_report() turns
+the last N loops into per-phase p50/p95 and flags regressions.
+
+With iteration_budget set, each iteration has a deadline. run_phase()
+and run_command() give a blocking call or subprocess the smaller of its
+own timeout and what is left of the budget. A phase that overruns is
+abandoned (callables) or killed (subprocess groups) and recorded in
+cut(), so one hung urlopen, IMAP fetch or git push costs a phase, not
+the heartbeat.
+
+AsyncLoopManager runs the per-iteration checks (mail, IRC inbox, web
+monitors, feeds) concurrently, each under its own deadline, so one slow
+server no longer delays the rest of the iteration.
 """
 
+import asyncio
 import os
-import re
+import select
+import signal
+import struct
+import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
+
+from .ring import RecordRing, percentile
+from .thoughts import ThoughtStream
+from .wake_log import WakeLog
+
+
+# inotify events that can change a file's mtime or size, or replace it
+_IN_EVENTS = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_EVENT = struct.Struct('iIII')   # wd, mask, cookie, name length
+
+
+def _inotify_libc():
+    """libc, if it has inotify (Linux); else None."""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (ImportError, OSError, AttributeError):
+        return None
+    return libc
+
+
+class PhaseTrace(RecordRing):
+    """
+    Ring buffer of (loop, phase, duration) records in a binary file.
+
+    Records are 24 bytes: loop number, duration in microseconds and the
+    phase name (up to 16 bytes). See meridian.ring for the file layout;
+    the file never grows past capacity records (192 KB by default).
+    """
+
+    RECORD = struct.Struct('<II16s')
+
+    def __init__(self, path: str, capacity: int = 8192):
+        super().__init__(path, b'MPT1', self.RECORD, capacity)
+
+    def append(self, records: list):
+        """Write [(loop, phase, seconds), ...] in one go."""
+        self.write([(loop, min(int(seconds * 1e6), 0xFFFFFFFF), name.encode()[:16])
+                    for loop, name, seconds in records])
+
+    def read(self) -> list:
+        """All records, oldest first, as (loop, phase, seconds)."""
+        return [(loop, name.rstrip(b'\0').decode(errors='replace'), us / 1e6)
+                for loop, us, name in self.rows()]
+
+
+class _Phase:
+    """Context manager returned by LoopManager.phase(); kept tiny on purpose."""
+
+    __slots__ = ('_spans', '_loop', '_name', '_t0')
+
+    def __init__(self, spans: list, loop: int, name: str):
+        self._spans = spans
+        self._loop = loop
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._spans.append((self._loop, self._name,
+                            time.perf_counter() - self._t0))
+        return False
 
 
 class LoopManager:
@@ -29,34 +132,62 @@ class LoopManager:
             manager.touch_heartbeat()
             manager.log(f'Loop {count} complete')
             manager.sleep(300)
+
+    Timing the parts of an iteration:
+        with manager.phase('email'):
+            emails = mail.get_unseen()
+        print(manager.phase_report(last=50))
+
+    Keeping an iteration inside its budget:
+        manager = LoopManager(..., iteration_budget=240)
+        manager.increment()                      # starts the deadline
+        html = manager.run_phase('web', lambda: fetch(url), timeout=30)
+        manager.run_command('deploy', ['git', 'push'], cwd=site, timeout=60)
+        manager.log(manager.cut_report())        # what was cut, if anything
+
+    With a scheduler attached, sleep() returns as soon as a time-based
+    task is due instead of up to check_interval seconds late:
+        manager = LoopManager(..., scheduler=TaskScheduler())
+        manager.install_signal_wakeup()          # kill -USR1 <pid> wakes it
+        manager.watch_file('/path/irc-inbox.txt')
     """
 
     def __init__(self,
                  heartbeat_path: str,
                  wake_state_path: Optional[str] = None,
                  loop_interval: int = 300,
-                 name: str = 'Meridian'):
+                 name: str = 'Meridian',
+                 scheduler=None,
+                 trace_path: Optional[str] = None,
+                 iteration_budget: Optional[float] = None):
         self.heartbeat_path = heartbeat_path
         self.wake_state_path = wake_state_path
         self.loop_interval  = loop_interval
         self.name           = name
+        self.scheduler      = scheduler
         self._count         = 0
         self._start_time    = datetime.now()
         self._last_loop     = None
+        self._wake_event    = threading.Event()
+        self._watched: dict = {}            # path -> (mtime_ns, size)
+        self._inotify = None                # (libc, fd), or False if unavailable
+        self._dir_wds: dict = {}            # inotify watch descriptor -> directory
+        self._polled: set = set()           # watched paths inotify doesn't cover
+        self._poller: Optional[threading.Thread] = None
+        self._spans: list = []
+        self._thoughts: Optional[ThoughtStream] = None
+        self.iteration_budget = iteration_budget
+        self._deadline: Optional[float] = None
+        self._cut: list = []
+        self._phase_pool: Optional[ThreadPoolExecutor] = None
+        self._abandoned: dict = {}   # phase name -> future still running
+        self.trace = PhaseTrace(trace_path or os.path.join(
+            os.path.dirname(heartbeat_path) or '.', '.loop-phases.ring'))
 
-        # Load current loop count from wake state
-        if wake_state_path:
-            self._count = self._read_loop_count()
-
-    def _read_loop_count(self) -> int:
-        """Read current loop count from wake-state.md."""
-        try:
-            with open(self.wake_state_path) as f:
-                content = f.read()
-            m = re.search(r'Loop iteration #(\d+)', content)
-            return int(m.group(1)) if m else 0
-        except:
-            return 0
+        # Load current loop count from the wake log's counter file
+        self.wake_log = WakeLog(wake_state_path) if wake_state_path else None
+        if self.wake_log:
+            self._count = self.wake_log.loop_count()
 
     @property
     def count(self) -> int:
@@ -77,72 +208,303 @@ class LoopManager:
             return float('inf')
 
     def log(self, message: str, print_to_stdout: bool = True):
-        """Log a message to the thoughts log."""
-        ts = datetime.now().strftime('%H:%M:%S')
-        line = f'[{ts}] {message}'
+        """Log a message to the thought stream (written in batches by a thread, flushed at exit)."""
         if print_to_stdout:
-            print(line)
-        try:
-            with open('/tmp/meridian_thoughts.txt', 'a') as f:
-                f.write(line + '\n')
-        except:
-            pass
+            ts = datetime.now().strftime('%H:%M:%S')
+            print(f'[{ts}] {message}')
+        if self._thoughts is None:
+            self._thoughts = ThoughtStream(background=True)
+        self._thoughts.append(message)
 
     def update_wake_state(self, status_line: str,
                           extra_context: Optional[str] = None):
         """
-        Prepend a new status line to wake-state.md.
+        Log this loop's status and re-render wake-state.md, newest first.
         status_line: brief description of this loop's work.
+        extra_context: kept in the structured log, not rendered.
         """
-        if not self.wake_state_path:
+        if not self.wake_log:
             return
         try:
-            with open(self.wake_state_path, 'r') as f:
-                content = f.read()
-
-            ts = datetime.now().strftime('%I:%M %p %b %d')
-            new_line = f'- Loop iteration #{self._count} COMPLETE. {ts}. {status_line}\n'
-
-            # Insert after "## Current Status: RUNNING"
-            marker = '## Current Status: RUNNING\n'
-            if marker in content:
-                content = content.replace(marker, marker + new_line)
-            else:
-                content = new_line + content
-
-            with open(self.wake_state_path, 'w') as f:
-                f.write(content)
+            self.wake_log.append(self._count, status_line, extra_context)
+            if self.wake_log.over_budget():
+                self.wake_log.compact()
         except Exception as e:
             print(f'Wake state update error: {e}')
 
     def increment(self):
-        """Increment loop counter."""
+        """
+        Increment loop counter. Writes the finished iteration's phase
+        timings and starts the next iteration's deadline.
+        """
+        self.flush_phases()
         self._count += 1
         self._last_loop = datetime.now()
+        self._cut = []
+        self._deadline = (time.monotonic() + self.iteration_budget
+                          if self.iteration_budget else None)
+
+    # ── Iteration deadline ──────────────────────────────────────────
+
+    def remaining(self) -> float:
+        """Seconds left in this iteration's budget (inf without one)."""
+        if self._deadline is None:
+            return float('inf')
+        return max(0.0, self._deadline - time.monotonic())
+
+    def _limit(self, timeout: Optional[float]) -> Optional[float]:
+        limit = min(timeout if timeout is not None else float('inf'),
+                    self.remaining())
+        return None if limit == float('inf') else limit
+
+    def _record_cut(self, name: str, reason: str, limit: Optional[float]):
+        self._cut.append({'phase': name, 'reason': reason, 'limit': limit})
+        self.touch_heartbeat()   # the loop is alive, just cutting corners
+
+    def run_phase(self, name: str, fn: Callable, timeout: Optional[float] = None,
+                  default: Any = None) -> Any:
+        """
+        Run a blocking callable as phase `name`, within `timeout` and the
+        iteration budget. On overrun the call is abandoned — its thread
+        runs on, and the phase is skipped as 'busy' until it returns — and
+        `default` is returned. Exceptions from fn propagate.
+        """
+        pending = self._abandoned.get(name)
+        if pending is not None:
+            if not pending.done():
+                self._record_cut(name, 'busy', None)
+                return default
+            del self._abandoned[name]
+        limit = self._limit(timeout)
+        if limit is not None and limit <= 0:
+            self._record_cut(name, 'skipped', 0.0)
+            return default
+        with self.phase(name):
+            if limit is None:
+                return fn()
+            if self._phase_pool is None:
+                self._phase_pool = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix='meridian-phase')
+            future = self._phase_pool.submit(fn)
+            try:
+                return future.result(timeout=limit)
+            except FutureTimeout:
+                self._abandoned[name] = future
+                self._record_cut(name, 'timeout', limit)
+                return default
+
+    def run_command(self, name: str, argv, timeout: Optional[float] = None,
+                    **popen_kwargs) -> subprocess.CompletedProcess:
+        """
+        Run a subprocess as phase `name`, within `timeout` and the iteration
+        budget. On overrun its whole process group is killed and the result
+        has returncode -9 with whatever output was produced.
+        """
+        limit = self._limit(timeout)
+        if limit is not None and limit <= 0:
+            self._record_cut(name, 'skipped', 0.0)
+            return subprocess.CompletedProcess(argv, -9, '', '')
+        popen_kwargs.setdefault('text', True)
+        with self.phase(name):
+            proc = subprocess.Popen(argv, shell=isinstance(argv, str),
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    start_new_session=True, **popen_kwargs)
+            try:
+                out, err = proc.communicate(timeout=limit)
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                out, err = proc.communicate()
+                self._record_cut(name, 'killed', limit)
+                return subprocess.CompletedProcess(argv, -9, out, err)
+        return subprocess.CompletedProcess(argv, proc.returncode, out, err)
+
+    def cut(self) -> list:
+        """Phases cut this iteration: [{'phase', 'reason', 'limit'}, ...]."""
+        return list(self._cut)
+
+    def cut_report(self) -> str:
+        """One line naming what was cut this iteration, or '' if nothing."""
+        if not self._cut:
+            return ''
+        parts = []
+        for c in self._cut:
+            limit = f" after {c['limit']:.1f}s" if c['limit'] else ''
+            parts.append(f"{c['phase']} ({c['reason']}{limit})")
+        return 'Cut: ' + ', '.join(parts)
+
+    def phase(self, name: str) -> _Phase:
+        """Time a block as phase `name` of the current iteration."""
+        return _Phase(self._spans, self._count, name)
+
+    def flush_phases(self):
+        """Write pending phase timings to the trace file."""
+        spans, self._spans[:] = self._spans[:], []
+        try:
+            self.trace.append(spans)
+        except OSError as e:
+            print(f'Phase trace error: {e}')
+
+    def phase_report(self, last: int = 50, threshold: float = 1.5) -> str:
+        """
+        Per-phase p50/p95 over the last `last` loops, compared with the
+        loops before them. A phase whose p50 grew by more than
+        `threshold`x is flagged as a regression.
+        """
+        self.flush_phases()
+        records = self.trace.read()
+        if not records:
+            return 'No phase timings recorded.'
+        loops = sorted({r[0] for r in records})
+        cutoff = loops[-last] if len(loops) > last else loops[0]
+        recent, before = {}, {}
+        for loop, name, secs in records:
+            (recent if loop >= cutoff else before).setdefault(name, []).append(secs)
+        lines = [f'Phase timings over the last {min(last, len(loops))} loops '
+                 f'(p50 / p95 / max, ms):']
+        for name in sorted(recent, key=lambda n: -sum(recent[n])):
+            vals = sorted(recent[name])
+            p50 = percentile(vals, 50)
+            line = (f'  {name:<16} {p50 * 1000:9.1f} {percentile(vals, 95) * 1000:9.1f} '
+                    f'{vals[-1] * 1000:9.1f}  n={len(vals)}')
+            if name in before:
+                base = percentile(sorted(before[name]), 50)
+                if base > 0 and p50 > base * threshold:
+                    line += f'  REGRESSION (was {base * 1000:.1f} ms)'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def wake(self):
+        """Cut the current (or next) sleep() short. Safe from threads and signal handlers."""
+        self._wake_event.set()
+
+    def install_signal_wakeup(self, signum: int = signal.SIGUSR1):
+        """Make `signum` (default SIGUSR1) wake the loop. Main thread only."""
+        signal.signal(signum, lambda *_: self.wake())
+
+    def watch_file(self, path: str, poll_interval: float = 1.0):
+        """
+        Wake the loop when `path` changes (mtime or size), e.g. an inbox file.
+        On Linux the file's directory is watched with inotify, so nothing
+        runs until it changes. Where that fails (no inotify, watch limit
+        reached, directory missing) the file is stat()ed every
+        poll_interval seconds by a background thread instead.
+        """
+        path = os.path.abspath(path)
+        self._watched[path] = self._file_stamp(path)
+        if self._inotify_watch(os.path.dirname(path)):
+            return
+        self._polled.add(path)
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._watch_files,
+                                            args=(poll_interval,), daemon=True)
+            self._poller.start()
+
+    def _inotify_watch(self, directory: str) -> bool:
+        """Watch `directory` through inotify; False if that isn't possible."""
+        if self._inotify is None:
+            libc = _inotify_libc()
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK) if libc else -1
+            self._inotify = (libc, fd) if fd >= 0 else False
+            if self._inotify:
+                threading.Thread(target=self._read_inotify, args=(fd,),
+                                 daemon=True).start()
+        if not self._inotify:
+            return False
+        if directory in self._dir_wds.values():
+            return True
+        libc, fd = self._inotify
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), _IN_EVENTS)
+        if wd < 0:
+            return False
+        self._dir_wds[wd] = directory
+        return True
+
+    def _read_inotify(self, fd: int):
+        while True:
+            select.select([fd], [], [])
+            try:
+                buf = os.read(fd, 65536)
+            except BlockingIOError:
+                continue
+            touched = set()
+            off = 0
+            while off < len(buf):
+                wd, mask, _, n = _IN_EVENT.unpack_from(buf, off)
+                name = buf[off + _IN_EVENT.size:off + _IN_EVENT.size + n].rstrip(b'\0')
+                off += _IN_EVENT.size + n
+                if mask & _IN_Q_OVERFLOW:
+                    touched.update(self._watched)
+                elif wd in self._dir_wds:
+                    touched.add(os.path.join(self._dir_wds[wd], os.fsdecode(name)))
+            self._check(touched & self._watched.keys())
+
+    def _check(self, paths):
+        """wake() if any of `paths` changed since it was last seen."""
+        for path in paths:
+            current = self._file_stamp(path)
+            if current != self._watched[path]:
+                self._watched[path] = current
+                self.wake()
+
+    @staticmethod
+    def _file_stamp(path: str):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _watch_files(self, poll_interval: float):
+        while True:
+            time.sleep(poll_interval)
+            self._check(list(self._polled))
 
     def sleep(self, seconds: Optional[int] = None,
               check_interval: int = 30,
-              early_exit_fn: Optional[Callable] = None):
+              early_exit_fn: Optional[Callable] = None) -> str:
         """
-        Sleep for `seconds` seconds, touching heartbeat every `check_interval`.
+        Sleep for up to `seconds` seconds, touching heartbeat every `check_interval`.
         early_exit_fn: if provided, called every check_interval.
                        If it returns True, sleep ends early.
+
+        Also ends early when the attached scheduler's next time-based task
+        comes due, or on wake(). Returns why it ended: 'timeout', 'task_due',
+        'wake' or 'early_exit'.
         """
         duration = seconds or self.loop_interval
-        elapsed  = 0
-        while elapsed < duration:
-            wait = min(check_interval, duration - elapsed)
-            time.sleep(wait)
-            elapsed += wait
+        end = time.monotonic() + duration
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return 'timeout'
+            task_wait = None
+            if self.scheduler is not None:
+                next_ts = self.scheduler.next_due_time()
+                if next_ts is not None:
+                    task_wait = max(0.0, next_ts - time.time())
+                    if task_wait == 0:
+                        return 'task_due'
+            wait = min(remaining, check_interval)
+            if task_wait is not None:
+                wait = min(wait, task_wait)
+            woke = self._wake_event.wait(wait)
             self.touch_heartbeat()
+            if woke:
+                self._wake_event.clear()
+                return 'wake'
             if early_exit_fn and early_exit_fn():
-                break
+                return 'early_exit'
 
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
-        pass
+        self.flush_phases()
+        if self._thoughts is not None:
+            self._thoughts.close()
 
     def time_since_start(self) -> str:
         """Human-readable time since loop manager was created."""
@@ -150,3 +512,141 @@ class LoopManager:
         h = int(delta.total_seconds() // 3600)
         m = int((delta.total_seconds() % 3600) // 60)
         return f'{h}h {m:02d}m'
+
+
+class AsyncLoopManager(LoopManager):
+    """
+    LoopManager whose iteration checks run concurrently under asyncio.
+
+    Checks are coroutine functions or plain blocking callables; the latter
+    run on a private thread pool. Each has its own timeout — a check that
+    misses it is reported as 'timeout' and the iteration goes on without
+    it. A blocking call can't be interrupted, so a timed-out thread keeps
+    running and that check is skipped until it returns. Timeouts are also
+    capped by the iteration budget; cut checks show up in cut().
+
+    Example:
+        manager = AsyncLoopManager(heartbeat_path, wake_state_path)
+        manager.add_check('email', mail.get_unseen, timeout=20)
+        manager.add_check('irc', inbox.read_all, timeout=5)
+        manager.add_check('web', monitor.check_all, timeout=60)
+        manager.add_check('feeds', feeds.fetch_all, timeout=60, every=6)
+
+        async def main():
+            while True:
+                results = await manager.iterate()
+                handle(results['email'].value if results['email'].ok else [])
+                manager.update_wake_state('checked mail, irc, web')
+                await manager.sleep_async()
+
+        asyncio.run(main())
+    """
+
+    def __init__(self, *args, max_workers: int = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checks: dict[str, dict] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='meridian-check')
+
+    def add_check(self, name: str, fn: Callable, timeout: float = 30,
+                  every: int = 1):
+        """
+        Register a check run by iterate().
+
+        fn: coroutine function or blocking callable, called with no arguments
+        timeout: seconds before the check is abandoned for this iteration
+        every: run only on every Nth iteration
+        """
+        self._checks[name] = {
+            'call': fn,
+            'async': asyncio.iscoroutinefunction(fn),
+            'timeout': timeout,
+            'every': every,
+            'pending': None,   # thread future still running past its timeout
+        }
+
+    def remove_check(self, name: str):
+        self._checks.pop(name, None)
+
+    async def _run_check(self, name: str, check: dict) -> 'CheckResult':
+        loop_no = self._count
+        limit = self._limit(check['timeout'])
+        if limit is not None and limit <= 0:
+            self._record_cut(name, 'skipped', 0.0)
+            return CheckResult(name, 'skipped', None, 0.0)
+        result = await self._run_check_inner(name, check, limit)
+        if result.status != 'busy':
+            self._spans.append((loop_no, name, result.duration))
+        if result.status in ('timeout', 'busy'):
+            self._record_cut(name, result.status, limit if result.status == 'timeout' else None)
+        return result
+
+    async def _run_check_inner(self, name: str, check: dict,
+                               limit: Optional[float]) -> 'CheckResult':
+        t0 = time.monotonic()
+        if check['pending'] is not None:
+            if not check['pending'].done():
+                return CheckResult(name, 'busy', None, 0.0)
+            check['pending'] = None
+        try:
+            if check['async']:
+                aw = check['call']()
+            else:
+                loop = asyncio.get_running_loop()
+                fut = loop.run_in_executor(self._pool, check['call'])
+                check['pending'] = fut
+                aw = asyncio.shield(fut)
+            # wait_for cancels a coroutine on timeout; a thread is abandoned
+            value = await asyncio.wait_for(aw, limit)
+            check['pending'] = None
+            return CheckResult(name, 'ok', value, time.monotonic() - t0)
+        except asyncio.TimeoutError:
+            return CheckResult(name, 'timeout', None, time.monotonic() - t0)
+        except Exception as e:
+            check['pending'] = None
+            return CheckResult(name, 'error', e, time.monotonic() - t0)
+
+    async def run_checks(self) -> dict[str, 'CheckResult']:
+        """Run the checks due this iteration concurrently; name -> CheckResult."""
+        due = {name: c for name, c in self._checks.items()
+               if self._count % c['every'] == 0}
+        results = await asyncio.gather(
+            *(self._run_check(name, c) for name, c in due.items()))
+        return {r.name: r for r in results}
+
+    async def iterate(self) -> dict[str, 'CheckResult']:
+        """One iteration: bump the count, touch the heartbeat, run the checks."""
+        self.increment()
+        self.touch_heartbeat()
+        return await self.run_checks()
+
+    async def sleep_async(self, seconds: Optional[int] = None,
+                          check_interval: int = 30,
+                          early_exit_fn: Optional[Callable] = None) -> str:
+        """sleep() without blocking the event loop. Same wake-ups and results."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.sleep, seconds, check_interval, early_exit_fn)
+
+    def __exit__(self, *args):
+        super().__exit__(*args)
+        self._pool.shutdown(wait=False)
+
+
+class CheckResult:
+    """Outcome of one check: 'ok', 'timeout', 'error', 'busy' or 'skipped'."""
+
+    __slots__ = ('name', 'status', 'value', 'duration')
+
+    def __init__(self, name: str, status: str, value: Any, duration: float):
+        self.name = name
+        self.status = status
+        self.value = value        # return value, or the exception on 'error'
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def __repr__(self):
+        return f'CheckResult({self.name!r}, {self.status!r}, {self.duration:.2f}s)'
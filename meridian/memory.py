@@ -21,17 +21,127 @@ Usage:
     contacts = mem.get_by_tag('contacts')
     url = mem.get('sammy.url')
 
-    # Search
+    # Search (whole tokens, not substrings; 'finger*' matches as a prefix)
     results = mem.search('fingerprint')
+    results = mem.search('sammy joel', mode='or')
+
+Storage modes:
+    'json'    — every mutation rewrites memory.json (default)
+    'journal' — mutations are appended to memory.json.journal and fsynced
+                in groups; the journal is compacted into memory.json in a
+                background thread once it grows past compact_every records
+
+    mem = Memory(storage='journal')
+    ...
+    mem.close()   # fsync anything still pending
+
+    # Multi-process regression check (exits non-zero if writes are lost)
+    python3 -m meridian.memory [WRITERS] [PER_WRITER] [json|journal]
+
+    'sqlite'  — entries live in an indexed SQLite database (memory.db)
+                with an FTS5 table for search(); nothing is loaded up
+                front, so the store scales to millions of entries. An
+                existing memory.json is migrated on first open.
+
+Expiry:
+    mem.set('health.api', 'ok', ttl=600)            # gone in 10 minutes
+    mem.set('weather.today', '-12C', expires_at=ts)  # gone at epoch ts
+    # Expired entries are invisible to every read and are dropped from
+    # disk with the next write (or mem.purge()).
+
+Batching:
+    with mem.batch():
+        for key, value in seed.items():
+            mem.set(key, value)   # one disk write for the whole block
 """
 
+import bisect
+import contextlib
+import fcntl
+import heapq
 import json
 import os
+import re
+import sqlite3
+import threading
 import time
 from typing import Any, Optional
 
 DEFAULT_MEMORY_FILE = os.path.expanduser("~/autonomous-ai/memory.json")
 
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> set[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def _query_term(term: str) -> tuple[list[str], Optional[str]]:
+    """
+    Split one search term into tokens that must match exactly and an
+    optional token prefix. Both backends use these rules:
+    'sammy.url' -> (['sammy', 'url'], None), 'joel.*' -> ([], 'joel'),
+    'sammy-p*' -> (['sammy'], 'p').
+    """
+    prefix = term.endswith("*")
+    tokens = _TOKEN_RE.findall(term.rstrip("*").lower())
+    if prefix and tokens:
+        return tokens[:-1], tokens[-1]
+    return tokens, None
+
+
+def _entry_tokens(key: str, entry: dict) -> set[str]:
+    """All searchable tokens for an entry: key, value, note and tags."""
+    tokens = _tokenize(key)
+    tokens |= _tokenize(str(entry.get("value", "")))
+    tokens |= _tokenize(entry.get("note", ""))
+    for tag in entry.get("tags", []):
+        tokens |= _tokenize(tag)
+    return tokens
+
+
+def _deletes(rec: dict, entry: Optional[dict]) -> bool:
+    """Whether a delete/expire record removes the current entry."""
+    if rec.get("op") == "delete":
+        return True
+    return (rec.get("op") == "expire" and entry is not None
+            and entry.get("expires_at") == rec["expires_at"])
+
+
+def _stat(path: str) -> Optional[tuple]:
+    """(inode, size, mtime_ns) for path, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _read_records(path: str, offset: int = 0) -> tuple[list[dict], int, Optional[int]]:
+    """
+    Read journal records from byte offset onwards.
+
+    Returns (records, new_offset, inode). Only complete lines are
+    consumed, so a write still in progress (or torn by a crash) is left
+    for next time. Complete lines that fail to parse are skipped.
+    """
+    try:
+        with open(path, "rb") as f:
+            ino = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            chunk = f.read()
+    except OSError:
+        return [], offset, None
+    end = chunk.rfind(b"\n") + 1
+    records = []
+    for line in chunk[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records, offset + end, ino
+
 
 class Memory:
     """
@@ -39,33 +149,474 @@ class Memory:
 
     Keys use dot notation for namespacing:
       'joel.email', 'sammy.url', 'system.hostname'
+
+    Safe to share between processes: writes take an exclusive fcntl lock
+    on memory.json.lock, merge in whatever other writers saved since our
+    last read (last writer wins per key, not per file), then write.
+    Reads stat the store files and reload only when they have changed.
     """
 
-    def __init__(self, memory_file: str = DEFAULT_MEMORY_FILE):
+    def __new__(cls, memory_file: str = DEFAULT_MEMORY_FILE,
+                storage: str = "json", **kwargs):
+        if cls is Memory and storage == "sqlite":
+            return super().__new__(SQLiteMemory)
+        return super().__new__(cls)
+
+    def __init__(self, memory_file: str = DEFAULT_MEMORY_FILE,
+                 storage: str = "json", sync_every: int = 32,
+                 compact_every: int = 1000):
+        if storage not in ("json", "journal"):
+            raise ValueError(f"Unknown storage mode: {storage}")
         self.memory_file = memory_file
-        self._data: dict = self._load()
+        self.journal_file = memory_file + ".journal"
+        self.lock_file = memory_file + ".lock"
+        self.storage = storage
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._lock_fd: Optional[int] = None
+        self._lock_depth = 0
+        self._journal = None          # open append handle (journal mode)
+        self._unsynced = 0            # records written since last fsync
+        self._journal_records = 0     # records since last compaction
+        self._journal_offset = 0      # bytes of the journal already applied
+        self._stamp: Optional[tuple] = None
+        self._compactor: Optional[threading.Thread] = None
+        self._batch_depth = 0
+        self._pending: list[dict] = []  # applied in memory, not yet on disk
+        self._data: dict = {"entries": {}, "version": 1}
+        # Tag -> keys and a sorted key list (for bisect prefix ranges),
+        # maintained by every change applied to the entries
+        self._tag_keys: dict[str, set[str]] = {}
+        self._sorted_keys: list[str] = []
+        # Inverted index (token -> keys), built lazily on first search
+        self._index: Optional[dict[str, set[str]]] = None
+        self._key_tokens: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] = []
+        # Min-heap of (expires_at, key); stale pairs are skipped on pop
+        self._expiry: list[tuple[float, str]] = []
+        self._expired_total = 0
+        self._refresh()
+
+    @property
+    def _compacting_file(self) -> str:
+        return self.journal_file + ".compacting"
+
+    # ── Locking and change detection ────────────────────────────────
 
-    def _load(self) -> dict:
+    @contextlib.contextmanager
+    def _file_lock(self, shared: bool = False):
+        """
+        Hold the cross-process lock. Re-entrant within one instance; the
+        outermost holder decides shared vs exclusive.
+        """
+        with self._lock:
+            if self._lock_depth == 0:
+                directory = os.path.dirname(self.lock_file)
+                if shared and directory and not os.path.isdir(directory):
+                    # Nothing on disk yet, so nothing to protect
+                    yield
+                    return
+                os.makedirs(directory, exist_ok=True)
+                self._lock_fd = os.open(self.lock_file,
+                                        os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd,
+                            fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    os.close(self._lock_fd)  # releases the flock
+                    self._lock_fd = None
+
+    def _disk_stamp(self) -> tuple:
+        return (_stat(self.memory_file), _stat(self._compacting_file),
+                _stat(self.journal_file))
+
+    def _refresh(self):
+        """Bring in-memory state up to date with disk and drop expired entries."""
+        with self._lock:
+            self._sync_from_disk()
+            if self._expiry and self._expiry[0][0] <= time.time():
+                self._expire()
+
+    def _sync_from_disk(self):
+        with self._lock:
+            stamp = self._disk_stamp()
+            if stamp == self._stamp:
+                return
+            old = self._stamp
+            snapshot, compacting, journal = stamp
+            if (old is not None and snapshot == old[0]
+                    and compacting == old[1] and journal
+                    and (journal[0] == old[2][0] if old[2]
+                         else self._journal_offset == 0)
+                    and journal[1] >= self._journal_offset):
+                # Only the journal grew: replay just the new tail
+                records, offset, ino = _read_records(self.journal_file,
+                                                     self._journal_offset)
+                if ino == journal[0]:
+                    for rec in records:
+                        self._apply(rec)
+                    self._journal_offset = offset
+                    self._journal_records += len(records)
+                    self._reapply_pending()
+                    self._stamp = stamp
+                    return
+            with self._file_lock(shared=True):
+                self._reload()
+
+    def _reload(self):
+        """Re-read snapshot + journals and apply the difference."""
+        data = {"entries": {}, "version": 1}
         if os.path.exists(self.memory_file):
             try:
                 with open(self.memory_file) as f:
-                    return json.load(f)
+                    data = json.load(f)
             except (json.JSONDecodeError, OSError):
                 pass
-        return {"entries": {}, "version": 1}
+        entries = data["entries"]
+        self._journal_records = 0
+        # Replay journals on top of the snapshot, oldest first. A
+        # '.compacting' file is left behind if we died mid-compaction.
+        records, _, _ = _read_records(self._compacting_file)
+        tail, self._journal_offset, _ = _read_records(self.journal_file)
+        for rec in records + tail:
+            if rec.get("op") == "set":
+                entries[rec["key"]] = rec["entry"]
+            elif _deletes(rec, entries.get(rec["key"])):
+                entries.pop(rec["key"], None)
+        self._journal_records = len(records) + len(tail)
+        self._stamp = self._disk_stamp()
+
+        current = self._data["entries"]
+        if not current:
+            self._data = data
+            self._rebuild_indexes()
+        else:
+            self._data["version"] = data.get("version", 1)
+            for key in [k for k in current if k not in entries]:
+                self._apply({"op": "delete", "key": key})
+            for key, entry in entries.items():
+                if current.get(key) != entry:
+                    self._apply({"op": "set", "key": key, "entry": entry})
+        self._reapply_pending()
+
+    def _reapply_pending(self):
+        """Our unsaved changes win over anything just read from disk."""
+        for rec in self._pending:
+            self._apply(rec)
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def _write_snapshot(self, data: dict, indent: Optional[int] = 2):
+        tmp = f"{self.memory_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.memory_file)
 
     def _save(self):
         os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
-        with open(self.memory_file, "w") as f:
-            json.dump(self._data, f, indent=2)
+        self._write_snapshot(self._data)
+        # A full rewrite supersedes anything left in a journal
+        for path in (self.journal_file, self._compacting_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _persist(self, op: str, key: str, entry: Optional[dict] = None):
+        """Apply one mutation in memory and record it for the disk."""
+        rec = {"op": op, "key": key}
+        if entry is not None:
+            rec["entry"] = entry
+        self._apply(rec)
+        self._pending.append(rec)
+        if not self._batch_depth:
+            self._flush(sync=False)
+
+    def _flush(self, sync: bool):
+        """Merge with disk and write out pending records under the lock."""
+        if not self._pending:
+            return
+        with self._file_lock():
+            self._refresh()
+            records, self._pending = self._pending, []
+            if self.storage == "json":
+                self._save()
+            else:
+                self._append(records, sync)
+            self._stamp = self._disk_stamp()
+        if (self.storage == "journal"
+                and self._journal_records >= self.compact_every):
+            self.compact(background=True)
+
+    def _append(self, records: list[dict], sync: bool):
+        """Write journal records; fsync now if sync, else in groups."""
+        if self._journal is not None and (
+                _stat(self.journal_file) or (None,))[0] != os.fstat(
+                    self._journal.fileno()).st_ino:
+            # Another process rotated the journal out from under us
+            self._sync_locked()
+            self._journal.close()
+            self._journal = None
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+            self._journal = open(self.journal_file, "ab")
+        if os.fstat(self._journal.fileno()).st_size > self._journal_offset:
+            # Torn write left by a crashed writer: terminate it so our
+            # first record isn't glued onto it
+            self._journal.write(b"\n")
+        self._journal.write("".join(json.dumps(r) + "\n" for r in records).encode())
+        self._journal.flush()
+        self._journal_offset = self._journal.tell()
+        self._unsynced += len(records)
+        self._journal_records += len(records)
+        if sync or self._unsynced >= self.sync_every:
+            self._sync_locked()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group mutations into a single write.
+
+        Inside the block set()/delete() only touch memory; on exit the
+        store is flushed once — one atomic rewrite in 'json' mode, one
+        journal append + fsync in 'journal' mode. Batches may nest.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush(sync=True)
+
+    def _sync_locked(self):
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+
+    def sync(self):
+        """Force any buffered journal records to disk."""
+        with self._lock:
+            self._sync_locked()
+
+    def compact(self, background: bool = False):
+        """
+        Fold the journal into a fresh memory.json snapshot.
+
+        The journal is rotated aside under the lock (cheap); serialising
+        and writing the snapshot happens outside it, optionally in a
+        background thread, so writers are not blocked. Only one process
+        compacts at a time: whoever rotated the journal owns the
+        '.compacting' file until the snapshot is in place.
+        """
+        if self.storage != "journal":
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        compacting = self._compacting_file
+        with self._file_lock():
+            self._refresh()
+            if os.path.exists(compacting):
+                if time.time() - os.path.getmtime(compacting) < 60:
+                    return  # someone else is mid-compaction
+                # Abandoned by a crashed compactor: our state already
+                # includes its records, so just write the snapshot.
+            elif not os.path.exists(self.journal_file):
+                return
+            else:
+                self._sync_locked()
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                os.replace(self.journal_file, compacting)
+                self._journal_offset = 0
+            entries = dict(self._data["entries"])
+            version = self._data.get("version", 1)
+            self._journal_records = 0
+            self._stamp = self._disk_stamp()
+
+        def write_snapshot():
+            tmp = f"{self.memory_file}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"entries": entries, "version": version}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._file_lock():
+                os.replace(tmp, self.memory_file)
+                if os.path.exists(compacting):
+                    os.remove(compacting)
+
+        if background:
+            self._compactor = threading.Thread(target=write_snapshot,
+                                               daemon=True)
+            self._compactor.start()
+        else:
+            write_snapshot()
+
+    def close(self):
+        """Flush pending journal writes and wait for any running compaction."""
+        self._flush(sync=True)
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._sync_locked()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    # ── Indexes ─────────────────────────────────────────────────────
+
+    def _apply(self, rec: dict):
+        """Apply one set/delete record to the entries and all indexes."""
+        key = rec["key"]
+        entries = self._data["entries"]
+        old = entries.get(key)
+        if rec.get("op") == "set":
+            if old is not None:
+                self._untrack(key, old, removed=False)
+            entries[key] = rec["entry"]
+            self._track(key, rec["entry"], is_new=old is None)
+        elif old is not None and _deletes(rec, old):
+            del entries[key]
+            self._untrack(key, old, removed=True)
+
+    def _rebuild_indexes(self):
+        entries = self._data["entries"]
+        self._sorted_keys = sorted(entries)
+        self._tag_keys = {}
+        self._expiry = []
+        for key, entry in entries.items():
+            for tag in entry.get("tags", []):
+                self._tag_keys.setdefault(tag, set()).add(key)
+            if entry.get("expires_at") is not None:
+                self._expiry.append((entry["expires_at"], key))
+        heapq.heapify(self._expiry)
+        self._index = None
+
+    def _expire(self) -> int:
+        """
+        Pop every expired entry off the heap: O(expired * log n).
+
+        Removals are applied in memory and queued as pending 'expire'
+        records, so they reach disk with the next write without making
+        reads write. An expire record only removes the entry if it still
+        has the expiry we saw pass; a value another process set since is
+        left alone.
+        """
+        now = time.time()
+        entries = self._data["entries"]
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = entries.get(key)
+            if entry is None or entry.get("expires_at") != expires_at:
+                continue  # re-set or deleted since this was pushed
+            rec = {"op": "expire", "key": key, "expires_at": expires_at}
+            self._apply(rec)
+            self._pending.append(rec)
+            removed += 1
+        self._expired_total += removed
+        return removed
+
+    def purge(self) -> int:
+        """Remove expired entries and write the removal to disk. Returns the count."""
+        before = self._expired_total
+        self._refresh()
+        removed = self._expired_total - before
+        if not self._batch_depth:
+            self._flush(sync=False)
+        return removed
+
+    def _build_index(self):
+        self._index = {}
+        self._key_tokens = {}
+        self._sorted_tokens = []
+        for key, entry in self._data["entries"].items():
+            self._index_add(key, entry)
+
+    def _track(self, key: str, entry: dict, is_new: bool):
+        """Add an entry to the tag, key and token indexes."""
+        if is_new:
+            bisect.insort(self._sorted_keys, key)
+        for tag in entry.get("tags", []):
+            self._tag_keys.setdefault(tag, set()).add(key)
+        if entry.get("expires_at") is not None:
+            heapq.heappush(self._expiry, (entry["expires_at"], key))
+        self._index_add(key, entry)
+
+    def _untrack(self, key: str, entry: dict, removed: bool):
+        """Drop an entry from the tag, key and token indexes."""
+        if removed:
+            i = bisect.bisect_left(self._sorted_keys, key)
+            if i < len(self._sorted_keys) and self._sorted_keys[i] == key:
+                del self._sorted_keys[i]
+        for tag in entry.get("tags", []):
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+        self._index_remove(key)
+
+    def _index_add(self, key: str, entry: dict):
+        if self._index is None:
+            return
+        tokens = _entry_tokens(key, entry)
+        self._key_tokens[key] = tokens
+        for tok in tokens:
+            keys = self._index.get(tok)
+            if keys is None:
+                self._index[tok] = keys = set()
+                bisect.insort(self._sorted_tokens, tok)
+            keys.add(key)
+
+    def _index_remove(self, key: str):
+        if self._index is None:
+            return
+        for tok in self._key_tokens.pop(key, ()):
+            keys = self._index.get(tok)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._index[tok]
+                i = bisect.bisect_left(self._sorted_tokens, tok)
+                if i < len(self._sorted_tokens) and self._sorted_tokens[i] == tok:
+                    del self._sorted_tokens[i]
+
+    def _match_term(self, term: str) -> set[str]:
+        """Keys matching one query term (see _query_term for the rules)."""
+        tokens, prefix = _query_term(term)
+        sets = [self._index.get(t, set()) for t in tokens]
+        if prefix is not None:
+            i = bisect.bisect_left(self._sorted_tokens, prefix)
+            keys = set()
+            while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+                keys |= self._index[self._sorted_tokens[i]]
+                i += 1
+            sets.append(keys)
+        if not sets:
+            return set()
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
 
     def set(self, key: str, value: Any, tags: list[str] = None,
-            note: str = "") -> dict:
+            note: str = "", ttl: Optional[float] = None,
+            expires_at: Optional[float] = None) -> dict:
         """
         Store a value. Overwrites existing value for the same key.
 
+        ttl: seconds until the entry expires
+        expires_at: absolute expiry as a Unix timestamp (ttl wins if both)
+
         Returns the stored entry.
         """
+        self._refresh()
         entry = {
             "value": value,
             "tags": tags or [],
@@ -75,12 +626,16 @@ class Memory:
                 "created", time.strftime("%Y-%m-%d %H:%M:%S")
             ),
         }
-        self._data["entries"][key] = entry
-        self._save()
+        if ttl is not None:
+            expires_at = time.time() + ttl
+        if expires_at is not None:
+            entry["expires_at"] = expires_at
+        self._persist("set", key, entry)
         return entry
 
     def get(self, key: str, default: Any = None) -> Any:
         """Return the value for a key, or default if not found."""
+        self._refresh()
         entry = self._data["entries"].get(key)
         if entry is None:
             return default
@@ -88,64 +643,78 @@ class Memory:
 
     def get_entry(self, key: str) -> Optional[dict]:
         """Return the full entry (value + metadata) for a key."""
+        self._refresh()
         return self._data["entries"].get(key)
 
     def delete(self, key: str) -> bool:
         """Remove a key. Returns True if it existed."""
+        self._refresh()
         if key in self._data["entries"]:
-            del self._data["entries"][key]
-            self._save()
+            self._persist("delete", key)
             return True
         return False
 
     def get_by_tag(self, tag: str) -> dict:
         """Return all entries that have the given tag."""
-        return {
-            key: entry
-            for key, entry in self._data["entries"].items()
-            if tag in entry.get("tags", [])
-        }
+        self._refresh()
+        entries = self._data["entries"]
+        return {key: entries[key] for key in sorted(self._tag_keys.get(tag, ()))}
 
     def get_by_prefix(self, prefix: str) -> dict:
         """Return all entries whose key starts with prefix."""
-        return {
-            key: entry
-            for key, entry in self._data["entries"].items()
-            if key.startswith(prefix)
-        }
+        self._refresh()
+        lo = bisect.bisect_left(self._sorted_keys, prefix)
+        hi = bisect.bisect_left(self._sorted_keys, prefix + "\U0010ffff", lo)
+        entries = self._data["entries"]
+        return {key: entries[key] for key in self._sorted_keys[lo:hi]}
 
-    def search(self, query: str) -> dict:
+    def search(self, query: str, mode: str = "and") -> dict:
         """
-        Search keys, values, notes, and tags for the query string.
-        Case-insensitive.
+        Search keys, values, notes, and tags for the query terms.
+        Case-insensitive, whole-token matching via an inverted index.
+        Text is split into runs of letters and digits, and a term must
+        equal one of them: unlike the old substring scan, 'finger' does
+        not match 'fingerprint', nor 'sammy' 'sammyjankis.com'. Use
+        'finger*' / 'sammy*' for that.
+
+        query: whitespace-separated terms; 'term*' matches as a prefix
+        mode: 'and' (every term must match) or 'or' (any term)
         """
-        q = query.lower()
-        results = {}
-        for key, entry in self._data["entries"].items():
-            if (q in key.lower() or
-                    q in str(entry.get("value", "")).lower() or
-                    q in entry.get("note", "").lower() or
-                    any(q in t.lower() for t in entry.get("tags", []))):
-                results[key] = entry
-        return results
+        self._refresh()
+        if self._index is None:
+            self._build_index()
+        terms = query.split()
+        if not terms:
+            return {}
+        matched = None
+        for term in terms:
+            keys = self._match_term(term)
+            if mode == "or":
+                matched = keys if matched is None else matched | keys
+            else:
+                matched = keys if matched is None else matched & keys
+                if not matched:
+                    break
+        entries = self._data["entries"]
+        return {key: entries[key] for key in sorted(matched)}
 
     def all_keys(self) -> list[str]:
         """Return all stored keys, sorted."""
-        return sorted(self._data["entries"].keys())
+        self._refresh()
+        return list(self._sorted_keys)
 
     def all_tags(self) -> list[str]:
         """Return all unique tags in use."""
-        tags = set()
-        for entry in self._data["entries"].values():
-            tags.update(entry.get("tags", []))
-        return sorted(tags)
+        self._refresh()
+        return sorted(self._tag_keys)
 
     def summary(self) -> str:
         """Human-readable summary of all entries."""
+        self._refresh()
         if not self._data["entries"]:
             return "Memory is empty."
         lines = [f"Memory: {len(self._data['entries'])} entries, tags: {', '.join(self.all_tags())}"]
-        for key in self.all_keys():
+        for key in self._sorted_keys:
             entry = self._data["entries"][key]
             val = str(entry["value"])[:60]
             tags = ", ".join(entry.get("tags", []))
@@ -154,4 +723,354 @@ class Memory:
 
     def dump(self) -> dict:
         """Return a copy of all entries."""
+        self._refresh()
         return dict(self._data["entries"])
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id      INTEGER PRIMARY KEY,
+    key     TEXT NOT NULL UNIQUE,
+    value   TEXT NOT NULL,
+    note    TEXT NOT NULL DEFAULT '',
+    created TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+CREATE INDEX IF NOT EXISTS entries_updated ON entries(updated);
+CREATE TABLE IF NOT EXISTS tags (
+    tag      TEXT NOT NULL,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, entry_id)
+);
+CREATE INDEX IF NOT EXISTS tags_entry ON tags(entry_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts
+    USING fts5(key, value, note, tags);
+"""
+
+
+# Row filter for entries that have not expired; binds the current time
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+# SQLiteMemory deletes expired rows on open and then at most this often
+PURGE_INTERVAL = 60
+
+
+def _sqlite_path(memory_file: str) -> str:
+    """memory.json -> memory.db; anything else is used as-is."""
+    root, ext = os.path.splitext(memory_file)
+    return root + ".db" if ext == ".json" else memory_file
+
+
+def _sqlite_connect(db_file: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_file, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SQLITE_SCHEMA)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(entries)")]
+    if "expires_at" not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_expires "
+                 "ON entries(expires_at) WHERE expires_at IS NOT NULL")
+    conn.commit()
+    return conn
+
+
+def _sqlite_write(conn: sqlite3.Connection, key: str, entry: dict):
+    """Insert or replace one entry (row, tags and FTS) without committing."""
+    value = json.dumps(entry["value"])
+    tags = list(dict.fromkeys(entry.get("tags", [])))
+    row = conn.execute("SELECT id FROM entries WHERE key = ?", (key,)).fetchone()
+    if row:
+        entry_id = row[0]
+        conn.execute(
+            "UPDATE entries SET value = ?, note = ?, updated = ?, "
+            "expires_at = ? WHERE id = ?",
+            (value, entry["note"], entry["updated"],
+             entry.get("expires_at"), entry_id))
+        conn.execute("DELETE FROM tags WHERE entry_id = ?", (entry_id,))
+        conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (entry_id,))
+    else:
+        entry_id = conn.execute(
+            "INSERT INTO entries (key, value, note, created, updated, "
+            "expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, value, entry["note"], entry["created"],
+             entry["updated"], entry.get("expires_at"))).lastrowid
+    conn.executemany("INSERT INTO tags (tag, entry_id) VALUES (?, ?)",
+                     [(t, entry_id) for t in tags])
+    conn.execute(
+        "INSERT INTO entries_fts (rowid, key, value, note, tags) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (entry_id, *(" ".join(_TOKEN_RE.findall(text.lower())) for text in
+                     (key, str(entry["value"]), entry["note"], " ".join(tags)))))
+
+
+def _ordered_tags(joined: Optional[str]) -> list[str]:
+    """Tags from _select()'s "rowid<RS>tag<US>..." column, in rowid order."""
+    if not joined:
+        return []
+    pairs = (item.split("\x1e", 1) for item in joined.split("\x1f"))
+    return [tag for _, tag in sorted(pairs, key=lambda p: int(p[0]))]
+
+
+class SQLiteMemory(Memory):
+    """
+    Memory backed by SQLite. Same public API as Memory.
+
+    Selected with Memory(storage='sqlite'). Keys, tags (join table),
+    created and updated are indexed columns; search() runs against an
+    FTS5 table fed the same tokens as the in-memory index, so a query
+    matches the same entries on every backend.
+    Expired rows are filtered out of every read, and deleted on open
+    and by writes at most once every PURGE_INTERVAL seconds.
+    """
+
+    def __init__(self, memory_file: str = DEFAULT_MEMORY_FILE,
+                 storage: str = "sqlite", **kwargs):
+        self.memory_file = memory_file
+        self.db_file = _sqlite_path(memory_file)
+        self.storage = "sqlite"
+        self._batch_depth = 0
+        if (not os.path.exists(self.db_file) and self.db_file != memory_file
+                and os.path.exists(memory_file)):
+            migrate_json_to_sqlite(memory_file, self.db_file)
+        self._conn = _sqlite_connect(self.db_file)
+        self._next_purge = 0.0
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + PURGE_INTERVAL
+            self.purge()
+
+    def _commit(self):
+        if not self._batch_depth:
+            self._conn.commit()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Run the block's mutations in a single SQLite transaction."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._conn.commit()
+
+    def sync(self):
+        self._conn.commit()
+
+    def compact(self, background: bool = False):
+        pass
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+    def _select(self, where: str = "1", params: tuple = ()) -> dict:
+        # Tags come back in the same query as "rowid<RS>tag" joined with
+        # the unit separator. GROUP_CONCAT's order is unspecified, so they
+        # are put back in insertion (rowid) order here.
+        rows = self._conn.execute(
+            "SELECT key, value, note, created, updated, expires_at, "
+            "GROUP_CONCAT(tags.rowid || char(30) || tag, char(31)) FROM entries "
+            "LEFT JOIN tags ON tags.entry_id = entries.id "
+            f"WHERE ({where}) AND {_LIVE} GROUP BY entries.id ORDER BY key",
+            params + (time.time(),)).fetchall()
+        results = {}
+        for key, value, note, created, updated, expires_at, tags in rows:
+            results[key] = {
+                "value": json.loads(value),
+                "tags": _ordered_tags(tags),
+                "note": note,
+                "updated": updated,
+                "created": created,
+            }
+            if expires_at is not None:
+                results[key]["expires_at"] = expires_at
+        return results
+
+    def _delete_ids(self, ids: list[tuple]):
+        self._conn.executemany("DELETE FROM entries_fts WHERE rowid = ?", ids)
+        self._conn.executemany("DELETE FROM entries WHERE id = ?", ids)
+
+    def purge(self) -> int:
+        ids = self._conn.execute(
+            "SELECT id FROM entries WHERE expires_at <= ?",
+            (time.time(),)).fetchall()
+        if ids:
+            self._delete_ids(ids)
+            self._commit()
+        return len(ids)
+
+    def set(self, key: str, value: Any, tags: list[str] = None,
+            note: str = "", ttl: Optional[float] = None,
+            expires_at: Optional[float] = None) -> dict:
+        self._maybe_purge()
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        row = self._conn.execute(
+            "SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+        entry = {
+            "value": value,
+            "tags": tags or [],
+            "note": note,
+            "updated": now,
+            "created": row[0] if row else now,
+        }
+        if ttl is not None:
+            expires_at = time.time() + ttl
+        if expires_at is not None:
+            entry["expires_at"] = expires_at
+        _sqlite_write(self._conn, key, entry)
+        self._commit()
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute(
+            f"SELECT value FROM entries WHERE key = ? AND {_LIVE}",
+            (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_entry(self, key: str) -> Optional[dict]:
+        return self._select("key = ?", (key,)).get(key)
+
+    def delete(self, key: str) -> bool:
+        row = self._conn.execute(
+            f"SELECT id, {_LIVE} FROM entries WHERE key = ?",
+            (time.time(), key)).fetchone()
+        if not row:
+            return False
+        self._delete_ids([row[:1]])
+        self._commit()
+        return bool(row[1])
+
+    def get_by_tag(self, tag: str) -> dict:
+        return self._select(
+            "id IN (SELECT entry_id FROM tags WHERE tag = ?)", (tag,))
+
+    def get_by_prefix(self, prefix: str) -> dict:
+        if not prefix:
+            return self._select()
+        # Range scan on the key index rather than LIKE, which can't use it
+        return self._select("key >= ? AND key < ?",
+                            (prefix, prefix + "\U0010ffff"))
+
+    def search(self, query: str, mode: str = "and") -> dict:
+        clauses = []
+        for term in query.split():
+            tokens, prefix = _query_term(term)
+            parts = [f'"{t}"' for t in tokens]
+            if prefix is not None:
+                parts.append(f'"{prefix}"*')
+            if parts:
+                clauses.append("(" + " AND ".join(parts) + ")")
+        if not clauses:
+            return {}
+        match = (" OR " if mode == "or" else " AND ").join(clauses)
+        return self._select(
+            "id IN (SELECT rowid FROM entries_fts "
+            "WHERE entries_fts MATCH ?)", (match,))
+
+    def all_keys(self) -> list[str]:
+        return [k for (k,) in self._conn.execute(
+            f"SELECT key FROM entries WHERE {_LIVE} ORDER BY key",
+            (time.time(),))]
+
+    def all_tags(self) -> list[str]:
+        return [t for (t,) in self._conn.execute(
+            "SELECT DISTINCT tag FROM tags JOIN entries "
+            f"ON entries.id = tags.entry_id WHERE {_LIVE} ORDER BY tag",
+            (time.time(),))]
+
+    def summary(self) -> str:
+        (count,) = self._conn.execute(
+            f"SELECT COUNT(*) FROM entries WHERE {_LIVE}",
+            (time.time(),)).fetchone()
+        if not count:
+            return "Memory is empty."
+        lines = [f"Memory: {count} entries, tags: {', '.join(self.all_tags())}"]
+        for key, entry in self._select().items():
+            val = str(entry["value"])[:60]
+            tags = ", ".join(entry.get("tags", []))
+            lines.append(f"  {key}: {val} [{tags}]")
+        return "\n".join(lines)
+
+    def dump(self) -> dict:
+        return self._select()
+
+
+def migrate_json_to_sqlite(json_file: str = DEFAULT_MEMORY_FILE,
+                           db_file: Optional[str] = None) -> int:
+    """
+    One-shot import of memory.json (plus any journal) into SQLite.
+
+    Keys already in the database are overwritten. Returns the number
+    of entries migrated.
+    """
+    entries = Memory(json_file)._data["entries"]
+    conn = _sqlite_connect(db_file or _sqlite_path(json_file))
+    try:
+        with conn:
+            for key, entry in entries.items():
+                _sqlite_write(conn, key, {
+                    "value": entry.get("value"),
+                    "tags": entry.get("tags", []),
+                    "note": entry.get("note", ""),
+                    "created": entry.get("created", ""),
+                    "updated": entry.get("updated", ""),
+                    "expires_at": entry.get("expires_at"),
+                })
+    finally:
+        conn.close()
+    return len(entries)
+
+
+def _stress_writer(memory_file: str, storage: str, writer: int, count: int):
+    mem = Memory(memory_file, storage=storage, sync_every=8, compact_every=50)
+    for i in range(count):
+        if i % 10 == 0:
+            with mem.batch():
+                mem.set(f"w{writer}.{i:05d}", i, tags=[f"w{writer}"])
+        else:
+            mem.set(f"w{writer}.{i:05d}", i, tags=[f"w{writer}"])
+    mem.close()
+
+
+def stress_test(memory_file: str, writers: int = 6, per_writer: int = 100,
+                storage: str = "journal") -> list[str]:
+    """
+    Run `writers` processes that each set `per_writer` distinct keys in
+    one store, with compaction forced every 50 records, then check that
+    a fresh reader sees every write. Returns the keys that were lost.
+    """
+    import multiprocessing
+    procs = [multiprocessing.Process(target=_stress_writer,
+                                     args=(memory_file, storage, w, per_writer))
+             for w in range(writers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    entries = Memory(memory_file, storage=storage).dump()
+    return [f"w{w}.{i:05d}" for w in range(writers) for i in range(per_writer)
+            if entries.get(f"w{w}.{i:05d}", {}).get("value") != i]
+
+
+if __name__ == "__main__":
+    # Multi-process check: python3 -m meridian.memory [WRITERS] [PER_WRITER] [json|journal]
+    import sys
+    import tempfile
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    per_writer = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    storage = sys.argv[3] if len(sys.argv) > 3 else "journal"
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        lost = stress_test(os.path.join(tmp, "memory.json"), writers,
+                           per_writer, storage)
+        print(f"{storage}: {writers} writers x {per_writer} keys in "
+              f"{time.perf_counter() - t0:.1f}s, {len(lost)} lost"
+              + (f" (e.g. {', '.join(lost[:5])})" if lost else ""))
+    sys.exit(1 if lost else 0)
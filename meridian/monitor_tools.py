@@ -14,8 +14,14 @@ Usage:
     for url_id, change in changes.items():
         if change['changed']:
             print(f"{url_id} changed!")
+
+    # Register many URLs with a single write to disk
+    with monitor.batch():
+        for url_id, url in urls.items():
+            monitor.add(url_id, url)
 """
 
+import contextlib
 import hashlib
 import json
 import os
@@ -53,6 +59,8 @@ class WebMonitor:
     def __init__(self, state_file: str = DEFAULT_STATE_FILE):
         self.state_file = state_file
         self._state: dict = self._load()
+        self._batch_depth = 0
+        self._dirty = False
 
     def _load(self) -> dict:
         if os.path.exists(self.state_file):
@@ -64,9 +72,31 @@ class WebMonitor:
         return {"urls": {}}
 
     def _save(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
         os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
-        with open(self.state_file, "w") as f:
+        tmp = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
             json.dump(self._state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_file)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Defer saving until the block exits, then write the state once.
+        Batches may nest; only the outermost one writes.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self._save()
 
     def add(self, url_id: str, url: str, description: str = "") -> dict:
         """
@@ -168,8 +198,9 @@ class WebMonitor:
         Returns dict of url_id -> check result.
         """
         results = {}
-        for url_id in list(self._state["urls"].keys()):
-            results[url_id] = self.check(url_id)
+        with self.batch():
+            for url_id in list(self._state["urls"].keys()):
+                results[url_id] = self.check(url_id)
         return results
 
     def changed_since(self, since_ts: Optional[str] = None) -> list[str]:
@@ -0,0 +1,91 @@
+"""
+meridian.ring — Fixed-size binary ring files and percentiles
+
+Shared by the scheduler's run history and the loop's phase trace. A ring
+file is a 16-byte header (magic, capacity, next slot, count) followed by
+`capacity` fixed-width records. Appending rewrites the records written
+and the header, so the file never grows past its capacity; reading
+returns the records oldest first.
+
+Usage:
+    import struct
+    from meridian.ring import RecordRing, percentile
+
+    ring = RecordRing('/tmp/samples.ring', b'SMP1', struct.Struct('<dI'), 1024)
+    ring.write([(1.5, 3), (2.0, 4)])
+    durations = sorted(r[0] for r in ring.rows())
+    percentile(durations, 95)
+"""
+
+import fcntl
+import os
+import struct
+
+
+class RecordRing:
+    """
+    Ring buffer of `record`-packed tuples in a binary file.
+
+    Writers take an exclusive flock on the file and readers a shared
+    one, so several processes can share a ring.
+    """
+
+    HEADER = struct.Struct('<4sIII')
+
+    def __init__(self, path: str, magic: bytes, record: struct.Struct,
+                 capacity: int):
+        self.path = path
+        self.magic = magic
+        self.record = record
+        self.capacity = capacity
+
+    def _header(self, f) -> tuple[int, int, int]:
+        """(capacity, next slot, count) of an open ring file."""
+        f.seek(0)
+        raw = f.read(self.HEADER.size)
+        if len(raw) == self.HEADER.size:
+            magic, cap, head, count = self.HEADER.unpack(raw)
+            if magic == self.magic:
+                return cap, head, count
+        return self.capacity, 0, 0
+
+    def write(self, rows: list):
+        """Append rows (tuples matching the record struct) in one go."""
+        if not rows:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            cap, head, count = self._header(f)
+            for row in rows[-cap:]:
+                f.seek(self.HEADER.size + head * self.record.size)
+                f.write(self.record.pack(*row))
+                head = (head + 1) % cap
+                count = min(count + 1, cap)
+            f.seek(0)
+            f.write(self.HEADER.pack(self.magic, cap, head, count))
+
+    def rows(self) -> list:
+        """All records, oldest first, as unpacked tuples."""
+        try:
+            with open(self.path, 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                cap, head, count = self._header(f)
+                body = f.read(cap * self.record.size)
+        except OSError:
+            return []
+        first = (head - count) % cap
+        out = []
+        for i in range(count):
+            off = ((first + i) % cap) * self.record.size
+            if off + self.record.size > len(body):
+                break
+            out.append(self.record.unpack_from(body, off))
+        return out
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
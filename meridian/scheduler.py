@@ -5,9 +5,30 @@ Allows the autonomous loop to schedule tasks for:
   - A specific date/time ("run fingerprint.py on 2026-02-25")
   - A specific loop count ("every 10 loops, check Sammy's site")
   - A recurring interval ("every 24 hours, run health report")
+  - A cron expression ("*/15 9-17 * * 1-5")
 
 State is persisted to a JSON file so scheduled tasks survive
-context resets and watchdog restarts.
+context resets and watchdog restarts. Finished one-time tasks are moved
+out of it into an append-only archive (schedule-archive.jsonl).
+
+Each firing is claimed through a lease file before it is returned, so
+when the watchdog restarts the loop while the old instance is still
+winding down, only one of them runs a given firing. Leases expire, so a
+claimant that crashed doesn't block the task forever.
+
+Every run's start, end, duration and outcome goes into a fixed-size
+ring-buffer file per task (schedule-history/<id>.ring), so stats()
+can report p50/p95/max duration and overruns from real data.
+
+Tasks can declare a cost class ('light', 'normal', 'heavy'). When the
+load average or free RAM says the box is busy (e.g. Ollama is running
+inference), due tasks above 'light' are deferred with a doubling
+back-off, bounded both per step and in how many times they can be put
+off.
+
+Due tasks are found through two min-heaps — one keyed on next-fire
+epoch, one on next-fire loop number — so get_due() only touches tasks
+that are actually due, however many are scheduled.
 
 Usage:
     scheduler = TaskScheduler()
@@ -17,29 +38,281 @@ Usage:
 
     # Schedule a recurring task
     scheduler.every_n_loops(10, 'sammy-check', 'Check sammyjankis.com for new journals')
+    scheduler.every_n_hours(24, 'backup', 'Nightly backup', cost='heavy')
+    scheduler.cron('0 9 * * mon-fri', 'digest', 'Weekday morning learning digest')
 
     # In the loop:
     due = scheduler.get_due(current_loop=loop_count)
     for task in due:
         print(f"DUE: {task['name']} — {task['description']}")
         scheduler.mark_done(task['id'])
+
+    # Register many tasks with a single write to disk
+    with scheduler.batch():
+        for name in feeds:
+            scheduler.every_n_hours(6, f'feed-{name}')
+
+Running tasks off the main loop:
+    executor = TaskExecutor(scheduler, max_workers=4)
+    executor.register('system-report', command='python3 system-report.py',
+                      timeout=120)
+    executor.register('sammy-check', fn=check_sammy, timeout=30)
+
+    # In the loop — dispatches handled tasks to the pool, returns the rest
+    for task in executor.run_due(current_loop=loop_count):
+        handle_inline(task)
+    executor.collect()   # record finished runs into schedule.json
+
+    # Inline tasks can be timed too
+    with scheduler.timed(task):
+        handle_inline(task)
+    scheduler.stats(task)  # {'runs': 42, 'p50': 0.8, 'p95': 3.1, ...}
 """
 
+import contextlib
+import fcntl
+import heapq
 import json
 import os
+import queue
+import signal
+import socket
+import struct
+import subprocess
+import threading
 import time
+import traceback
 import uuid
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Union
+
+from .ring import RecordRing, percentile
+from .system_tools import SystemMonitor
 
 DEFAULT_SCHEDULE_FILE = os.path.expanduser("~/autonomous-ai/schedule.json")
 
+TIME_TYPES = ("datetime", "time_interval", "cron")
+LOOP_TYPES = ("loop_once", "loop_interval")
+RECURRING_TYPES = ("loop_interval", "time_interval", "cron")
+
+
+def _recurring(task: dict) -> bool:
+    """True for tasks that reschedule themselves instead of finishing."""
+    return task["type"] in RECURRING_TYPES or (
+        task["type"] == "datetime" and bool(task.get("repeat")))
+
+
+_CRON_NAMES = {
+    3: {m: i + 1 for i, m in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split())},
+    4: {d: i for i, d in enumerate("sun mon tue wed thu fri sat".split())},
+}
+_CRON_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _next_bit(mask: int, start: int) -> Optional[int]:
+    """Lowest set bit of mask at position >= start, or None."""
+    rest = mask >> start
+    if not rest:
+        return None
+    return start + (rest & -rest).bit_length() - 1
+
+
+class CronExpr:
+    """
+    A compiled five-field cron expression (minute hour dom month dow).
+
+    Each field becomes an int bitset, so matching is a bit test and
+    next_after() jumps straight to the next set bit per field instead of
+    stepping minute by minute. Supports '*', 'a-b', lists, '/step' and
+    month/weekday names; day-of-month and day-of-week are ORed when both
+    are restricted, as in Vixie cron.
+    """
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        masks = [self._parse_field(f, i) for i, f in enumerate(fields)]
+        if masks[4] & (1 << 7):
+            masks[4] = (masks[4] | 1) & ~(1 << 7)  # 7 is also Sunday
+        self.minutes, self.hours, self.doms, self.months, self.dows = masks
+        self.dom_any = fields[2] == "*"
+        self.dow_any = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, index: int) -> int:
+        lo, hi = _CRON_BOUNDS[index]
+        names = _CRON_NAMES.get(index, {})
+
+        def value(tok: str) -> int:
+            v = names.get(tok.lower())
+            v = int(tok) if v is None else v
+            if not lo <= v <= hi:
+                raise ValueError(f"Cron value {tok!r} out of range {lo}-{hi}")
+            return v
+
+        mask = 0
+        for part in field.split(","):
+            rng, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                a, b = rng.split("-", 1)
+                start, end = value(a), value(b)
+            else:
+                start = value(rng)
+                end = hi if step > 1 else start
+            for v in range(start, end + 1, step):
+                mask |= 1 << v
+        return mask
+
+    def _day_matches(self, d: datetime) -> bool:
+        dom = bool(self.doms >> d.day & 1)
+        dow = bool(self.dows >> ((d.weekday() + 1) % 7) & 1)
+        if self.dom_any or self.dow_any:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, ts: float) -> Optional[float]:
+        """Epoch of the first matching minute strictly after ts (local time)."""
+        d = datetime.fromtimestamp(ts).replace(second=0, microsecond=0)
+        d += timedelta(minutes=1)
+        limit = d.year + 5  # no match within 5 years means never (e.g. Feb 30)
+        while d.year <= limit:
+            month = _next_bit(self.months, d.month)
+            if month is None:
+                d = datetime(d.year + 1, 1, 1)
+                continue
+            if month != d.month:
+                d = datetime(d.year, month, 1)
+            if not self._day_matches(d):
+                d = datetime(d.year, d.month, d.day) + timedelta(days=1)
+                continue
+            hour = _next_bit(self.hours, d.hour)
+            if hour is None:
+                d = datetime(d.year, d.month, d.day) + timedelta(days=1)
+                continue
+            if hour != d.hour:
+                d = d.replace(hour=hour, minute=0)
+            minute = _next_bit(self.minutes, d.minute)
+            if minute is None:
+                d = d.replace(minute=0) + timedelta(hours=1)
+                continue
+            return time.mktime(d.replace(minute=minute).timetuple())
+        return None
+
+
+def _parse_trigger(datetime_str: str) -> Optional[float]:
+    """'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD' (midnight) -> local epoch seconds."""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(datetime_str, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def _trigger(datetime_str: str) -> str:
+    if _parse_trigger(datetime_str) is None:
+        raise ValueError(f"unparseable datetime {datetime_str!r}; "
+                         "expected 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD'")
+    return datetime_str
+
+
+# Cost class -> (max load1 per CPU, min available RAM in MB) to run now
+COST_LIMITS = {
+    "light": None,
+    "normal": (1.5, 256),
+    "heavy": (0.8, 1024),
+}
+DEFER_BASE_SECONDS = 60      # first deferral of a time task; doubles after
+DEFER_MAX_SECONDS = 1800
+DEFER_MAX_LOOPS = 16         # loop tasks back off 1, 2, 4 ... loops
+MAX_DEFERRALS = 8            # then the task runs however busy the box is
+LOAD_SAMPLE_SECONDS = 5
+
+
+def _cost_class(cost: str) -> str:
+    if cost not in COST_LIMITS:
+        raise ValueError(f"unknown cost class {cost!r}; "
+                         f"expected one of {', '.join(COST_LIMITS)}")
+    return cost
+
+
+HISTORY_SIZE = 256
+RUN_STATUSES = ("ok", "error", "timeout")
+
+
+class RunHistory(RecordRing):
+    """
+    Fixed-size ring buffer of runs for one task, stored in a binary file.
+
+    Records are 24 bytes: (start, end, duration, status, overrun). See
+    meridian.ring for the file layout.
+    """
+
+    RECORD = struct.Struct("<ddfBB2x")
+
+    def __init__(self, path: str, capacity: int = HISTORY_SIZE):
+        super().__init__(path, b"MRH1", self.RECORD, capacity)
+
+    def append(self, start: float, end: float, status: str,
+               overrun: bool = False):
+        code = RUN_STATUSES.index(status) if status in RUN_STATUSES else 1
+        self.write([(start, end, end - start, code, overrun)])
+
+    def runs(self) -> list[dict]:
+        """Recorded runs, oldest first."""
+        return [{"start": start, "end": end,
+                 "duration": round(duration, 3),
+                 "status": RUN_STATUSES[code],
+                 "overrun": bool(overrun)}
+                for start, end, duration, code, overrun in self.rows()]
+
 
 class TaskScheduler:
     """Persistent loop-aware scheduler."""
 
-    def __init__(self, schedule_file: str = DEFAULT_SCHEDULE_FILE):
+    def __init__(self, schedule_file: str = DEFAULT_SCHEDULE_FILE,
+                 lease_seconds: Optional[float] = 600,
+                 monitor: Optional[SystemMonitor] = None):
+        """
+        lease_seconds: how long a claimed firing stays ours before another
+                       process may take it over; None disables leasing
+        monitor: source of load/RAM readings for deferring costly tasks
+        """
         self.schedule_file = schedule_file
-        self._tasks: list[dict] = self._load()
+        root, _ = os.path.splitext(schedule_file)
+        self.archive_file = root + "-archive.jsonl"
+        self.history_dir = root + "-history"
+        self.lease_file = schedule_file + ".leases"
+        self.lock_file = schedule_file + ".lock"
+        self.lease_seconds = lease_seconds
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._contested: dict[str, tuple] = {}  # one-shots claimed elsewhere
+        self.monitor = monitor or SystemMonitor()
+        self._load_sample: tuple[float, dict] = (0.0, {})
+        self._batch_depth = 0
+        self._dirty = False
+        self._by_id: dict[str, dict] = {}
+        self._trigger_ts: dict[str, Optional[float]] = {}
+        self._crons: dict[str, CronExpr] = {}
+        self._time_heap: list[tuple[float, str]] = []
+        self._loop_heap: list[tuple[int, str]] = []
+        self._fired: dict[str, dict] = {}     # due one-shots awaiting mark_done
+        self._unanchored: list[str] = []      # loop tasks waiting for a first loop
+        self._to_archive: list[dict] = []
+        self._tasks: list[dict] = []
+        for task in self._load():
+            if task.get("done") and not _recurring(task):
+                self._to_archive.append(task)
+            else:
+                self._tasks.append(task)
+                self._index(task)
 
     def _load(self) -> list:
         if os.path.exists(self.schedule_file):
@@ -50,40 +323,238 @@ class TaskScheduler:
                 pass
         return []
 
+    def _next_fire(self, task: dict):
+        """Next-fire epoch (time tasks) or loop number (loop tasks)."""
+        if "defer_to" in task:
+            return task["defer_to"]
+        t = task["type"]
+        if t == "datetime":
+            return self._trigger_ts.get(task["id"])
+        if t in ("time_interval", "cron"):
+            return task.get("next_run_ts", 0)
+        if t == "loop_once":
+            return task["trigger_loop"]
+        if t == "loop_interval":
+            return task.get("next_loop")
+        return None
+
+    def _index(self, task: dict):
+        """Register a task with the lookup table and the due-queues."""
+        self._by_id[task["id"]] = task
+        if task["type"] == "datetime":
+            # Parsed once here rather than re-normalised on every get_due()
+            self._trigger_ts[task["id"]] = _parse_trigger(task["trigger"])
+            if self._trigger_ts[task["id"]] is None and not task.get("done"):
+                print(f"Scheduler: task {task['id']} ({task['name']}) has an "
+                      f"unparseable trigger {task['trigger']!r} and will never run")
+        elif task["type"] == "cron":
+            self._crons[task["id"]] = CronExpr(task["expr"])
+        self._push(task)
+
+    def _push(self, task: dict):
+        fire = self._next_fire(task)
+        if task["type"] == "loop_interval" and fire is None:
+            self._unanchored.append(task["id"])
+        elif fire is None:
+            return
+        elif task["type"] in TIME_TYPES:
+            heapq.heappush(self._time_heap, (fire, task["id"]))
+        else:
+            heapq.heappush(self._loop_heap, (fire, task["id"]))
+
+    def _pop_due(self, heap: list, limit) -> list[dict]:
+        """Pop every live task whose key is <= limit. Stale entries are dropped."""
+        due = []
+        while heap and heap[0][0] <= limit:
+            fire, task_id = heapq.heappop(heap)
+            task = self._live(fire, task_id)
+            if task is not None:
+                due.append(task)
+        return due
+
+    def _live(self, fire, task_id: str) -> Optional[dict]:
+        """The task a heap entry refers to, or None if the entry is stale."""
+        task = self._by_id.get(task_id)
+        if task is None or self._next_fire(task) != fire:
+            return None  # removed or rescheduled since it was pushed
+        if task.get("done") and not _recurring(task):
+            return None
+        return task
+
+    # ── Load-aware deferral ─────────────────────────────────────────
+
+    def _system_load(self) -> dict:
+        sampled, load = self._load_sample
+        if time.monotonic() - sampled > LOAD_SAMPLE_SECONDS:
+            load = self.monitor.get_load()
+            self._load_sample = (time.monotonic(), load)
+        return load
+
+    def _too_busy(self, task: dict) -> bool:
+        limits = COST_LIMITS.get(task.get("cost", "light"))
+        if limits is None:
+            return False
+        max_load, min_ram = limits
+        load = self._system_load()
+        return (load.get("load1", 0) / load.get("cpus", 1) > max_load
+                or load.get("ram_avail_mb", min_ram) < min_ram)
+
+    def _defer(self, task: dict, now: float, current_loop: int) -> bool:
+        """
+        Push a costly task back while the box is busy. Returns True if
+        deferred; after MAX_DEFERRALS in a row the task is let through.
+        """
+        streak = task.get("defer_streak", 0)
+        if streak >= MAX_DEFERRALS or not self._too_busy(task):
+            return False
+        if task["type"] in TIME_TYPES:
+            delay = min(DEFER_BASE_SECONDS * 2 ** streak, DEFER_MAX_SECONDS)
+            task["defer_to"] = now + delay
+            task["defer_seconds"] = task.get("defer_seconds", 0) + delay
+        else:
+            delay = min(2 ** streak, DEFER_MAX_LOOPS)
+            task["defer_to"] = current_loop + delay
+            task["defer_loops"] = task.get("defer_loops", 0) + delay
+        task["defer_streak"] = streak + 1
+        task["deferrals"] = task.get("deferrals", 0) + 1
+        self._push(task)
+        return True
+
+    # ── Leases ──────────────────────────────────────────────────────
+
+    @contextlib.contextmanager
+    def _lease_lock(self):
+        os.makedirs(os.path.dirname(self.lock_file) or ".", exist_ok=True)
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read_leases(self) -> dict:
+        try:
+            with open(self.lease_file) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_leases(self, leases: dict):
+        now = time.time()
+        # Forget leases that expired more than a day ago
+        leases = {k: v for k, v in leases.items() if v["expires"] > now - 86400}
+        tmp = f"{self.lease_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(leases, f)
+        os.replace(tmp, self.lease_file)
+
+    def _claim(self, firings: list[tuple]) -> tuple[set, set]:
+        """
+        Try to take the lease on each (task, fire) pair.
+
+        A firing is ours unless another owner holds an unexpired lease on
+        the same fire value. Returns (ids we own, ids another owner has
+        already finished).
+        """
+        ids = {task["id"] for task, _ in firings}
+        if not firings or self.lease_seconds is None:
+            return ids, set()
+        now = time.time()
+        owned, finished = set(), set()
+        with self._lease_lock():
+            leases = self._read_leases()
+            for task, fire in firings:
+                lease = leases.get(task["id"])
+                if (lease and lease["fire"] == fire
+                        and lease["owner"] != self._owner):
+                    if lease.get("done"):
+                        finished.add(task["id"])
+                        continue
+                    if lease["expires"] > now:
+                        continue
+                leases[task["id"]] = {"fire": fire, "owner": self._owner,
+                                      "expires": now + self.lease_seconds}
+                owned.add(task["id"])
+            self._write_leases(leases)
+        return owned, finished
+
+    def _release_done(self, task_id: str):
+        """Record that a one-time task's firing is finished for good."""
+        if self.lease_seconds is None:
+            return
+        with self._lease_lock():
+            leases = self._read_leases()
+            if task_id in leases:
+                leases[task_id].update(done=True, expires=time.time())
+                self._write_leases(leases)
+
     def _save(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
         os.makedirs(os.path.dirname(self.schedule_file), exist_ok=True)
-        with open(self.schedule_file, "w") as f:
+        if self._to_archive:
+            with open(self.archive_file, "a") as f:
+                for task in self._to_archive:
+                    f.write(json.dumps(task) + "\n")
+            self._to_archive = []
+        tmp = f"{self.schedule_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
             json.dump(self._tasks, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.schedule_file)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Defer saving until the block exits, then write the schedule once.
+        Batches may nest; only the outermost one writes.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._dirty = False
+                self._save()
 
     def _new_id(self) -> str:
         return str(uuid.uuid4())[:8]
 
     def at(self, datetime_str: str, name: str, description: str = "",
-           repeat: bool = False) -> dict:
+           repeat: bool = False, cost: str = "light") -> dict:
         """
         Schedule a task at a specific date/time.
 
-        datetime_str: "YYYY-MM-DD HH:MM" or "YYYY-MM-DD"
-        repeat: if True, reschedule 24h after each run
+        datetime_str: "YYYY-MM-DD HH:MM" or "YYYY-MM-DD" (ValueError otherwise)
+        repeat: if True, reschedule 24h after each run (mark_done() then
+                doesn't stop it — remove() does)
+        cost: 'light', 'normal' or 'heavy' — the costlier, the sooner it
+              is deferred while the box is busy (same for every method)
         """
         task = {
             "id": self._new_id(),
             "name": name,
             "description": description,
             "type": "datetime",
-            "trigger": datetime_str,
+            "trigger": _trigger(datetime_str),
             "repeat": repeat,
             "repeat_hours": 24 if repeat else None,
+            "cost": _cost_class(cost),
             "done": False,
             "last_run": None,
             "created": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
         self._tasks.append(task)
+        self._index(task)
         self._save()
         return task
 
     def every_n_loops(self, n: int, name: str, description: str = "",
-                      start_at_loop: Optional[int] = None) -> dict:
+                      start_at_loop: Optional[int] = None,
+                      cost: str = "light") -> dict:
         """
         Schedule a task to run every N loop iterations.
 
@@ -96,16 +567,19 @@ class TaskScheduler:
             "type": "loop_interval",
             "interval": n,
             "next_loop": start_at_loop,  # Will be set on first get_due call if None
+            "cost": _cost_class(cost),
             "done": False,
             "last_run": None,
             "run_count": 0,
             "created": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
         self._tasks.append(task)
+        self._index(task)
         self._save()
         return task
 
-    def every_n_hours(self, hours: float, name: str, description: str = "") -> dict:
+    def every_n_hours(self, hours: float, name: str, description: str = "",
+                      cost: str = "light") -> dict:
         """Schedule a task to run every N hours."""
         task = {
             "id": self._new_id(),
@@ -114,16 +588,45 @@ class TaskScheduler:
             "type": "time_interval",
             "interval_seconds": hours * 3600,
             "next_run_ts": time.time() + hours * 3600,
+            "cost": _cost_class(cost),
+            "done": False,
+            "last_run": None,
+            "run_count": 0,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._tasks.append(task)
+        self._index(task)
+        self._save()
+        return task
+
+    def cron(self, expr: str, name: str, description: str = "",
+             cost: str = "light") -> dict:
+        """
+        Schedule a task on a cron expression, e.g. '*/15 9-17 * * 1-5'.
+
+        The next fire time is computed up front and kept in the due-queue.
+        """
+        compiled = CronExpr(expr)
+        task = {
+            "id": self._new_id(),
+            "name": name,
+            "description": description,
+            "type": "cron",
+            "expr": expr,
+            "next_run_ts": compiled.next_after(time.time()),
+            "cost": _cost_class(cost),
             "done": False,
             "last_run": None,
             "run_count": 0,
             "created": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
         self._tasks.append(task)
+        self._index(task)
         self._save()
         return task
 
-    def once_at_loop(self, loop_number: int, name: str, description: str = "") -> dict:
+    def once_at_loop(self, loop_number: int, name: str, description: str = "",
+                     cost: str = "light") -> dict:
         """Schedule a one-time task at a specific loop number."""
         task = {
             "id": self._new_id(),
@@ -131,11 +634,13 @@ class TaskScheduler:
             "description": description,
             "type": "loop_once",
             "trigger_loop": loop_number,
+            "cost": _cost_class(cost),
             "done": False,
             "last_run": None,
             "created": time.strftime("%Y-%m-%d %H:%M:%S"),
         }
         self._tasks.append(task)
+        self._index(task)
         self._save()
         return task
 
@@ -144,80 +649,232 @@ class TaskScheduler:
         Return all tasks that are due now.
 
         Updates internal state for recurring tasks.
-        Call mark_done() on one-time tasks after handling them.
+        Call mark_done() on one-time tasks after handling them; until
+        then they are returned on every call.
         """
-        due = []
         now = time.time()
-        now_str = time.strftime("%Y-%m-%d %H:%M")
         changed = False
 
-        for task in self._tasks:
-            if task.get("done") and task["type"] not in ("loop_interval", "time_interval"):
-                continue
+        for task_id in self._unanchored:
+            task = self._by_id.get(task_id)
+            if task is not None and task.get("next_loop") is None:
+                # First call: initialize
+                task["next_loop"] = current_loop + task["interval"]
+                self._push(task)
+                changed = True
+        self._unanchored = []
 
-            t = task["type"]
-
-            if t == "datetime":
-                trigger = task["trigger"]
-                # Normalize: if just date given, match at 00:00
-                if len(trigger) == 10:
-                    trigger += " 00:00"
-                if not task["done"] and now_str >= trigger:
-                    due.append(task)
+        due = list(self._fired.values())
+        popped = []
+        for task in (self._pop_due(self._time_heap, now) +
+                     self._pop_due(self._loop_heap, current_loop)):
+            if self._defer(task, now, current_loop):
+                changed = True
+                continue
+            if task.pop("defer_to", None) is not None:
+                task["defer_streak"] = 0
+                changed = True
+            popped.append((task, self._next_fire(task)))
+        contested = list(self._contested.values())
+        owned, finished = self._claim(popped + contested)
 
-            elif t == "loop_once":
-                if not task["done"] and current_loop >= task["trigger_loop"]:
-                    due.append(task)
+        for task, fire in contested:
+            if task["id"] in owned:
+                # The other claimant's lease expired without finishing
+                del self._contested[task["id"]]
+                self._fired[task["id"]] = task
+                due.append(task)
+            elif task["id"] in finished:
+                # The claimant archived it; just drop our copy
+                del self._contested[task["id"]]
+                self._finish(task, archive=False)
+                changed = True
 
-            elif t == "loop_interval":
-                next_l = task.get("next_loop")
-                if next_l is None:
-                    # First call: initialize
-                    task["next_loop"] = current_loop + task["interval"]
-                    changed = True
-                elif current_loop >= next_l:
+        for task, fire in popped:
+            t = task["type"]
+            if not _recurring(task):
+                if task["id"] in owned:
+                    self._fired[task["id"]] = task
                     due.append(task)
-                    task["next_loop"] = current_loop + task["interval"]
-                    task["run_count"] = task.get("run_count", 0) + 1
-                    task["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                    changed = True
-
+                else:
+                    self._contested[task["id"]] = (task, fire)
+                continue
+            if t == "loop_interval":
+                task["next_loop"] = current_loop + task["interval"]
             elif t == "time_interval":
-                if now >= task.get("next_run_ts", 0):
-                    due.append(task)
-                    task["next_run_ts"] = now + task["interval_seconds"]
-                    task["run_count"] = task.get("run_count", 0) + 1
-                    task["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                    changed = True
+                # Step from the slot that fired, not from our own clock,
+                # so every instance computes (and leases) the same slot
+                interval = task["interval_seconds"]
+                task["next_run_ts"] = fire + (int((now - fire) // interval) + 1) * interval
+            elif t == "cron":
+                task["next_run_ts"] = self._crons[task["id"]].next_after(now)
+            else:
+                # Repeating datetime: step forward past any missed runs
+                step = task.get("repeat_hours") or 24
+                trigger_ts = self._trigger_ts[task["id"]]
+                while trigger_ts <= now:
+                    trigger_ts += step * 3600
+                self._trigger_ts[task["id"]] = trigger_ts
+                task["trigger"] = time.strftime("%Y-%m-%d %H:%M",
+                                                time.localtime(trigger_ts))
+            self._push(task)
+            changed = True
+            if task["id"] not in owned:
+                continue  # another instance claimed this firing
+            task["run_count"] = task.get("run_count", 0) + 1
+            task["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            due.append(task)
 
         if changed:
             self._save()
 
         return due
 
+    def next_due_time(self) -> Optional[float]:
+        """
+        Epoch time at which the next time-based task becomes due, or None.
+
+        Loop-count tasks are not included — they fire on the next
+        iteration regardless of how long the loop sleeps.
+        """
+        heap = self._time_heap
+        while heap:
+            fire, task_id = heap[0]
+            if self._live(fire, task_id) is not None:
+                return fire
+            heapq.heappop(heap)
+        return None
+
     def mark_done(self, task_id: str) -> bool:
-        """Mark a one-time task as done (won't trigger again)."""
-        for task in self._tasks:
-            if task["id"] == task_id:
-                task["done"] = True
-                task["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                self._save()
-                return True
-        return False
+        """
+        Mark a one-time task as done (won't trigger again).
+
+        Finished one-time tasks move to the archive file.
+        """
+        task = self._by_id.get(task_id)
+        if task is None:
+            return False
+        task["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        if not _recurring(task):
+            self._release_done(task_id)
+        self._finish(task)
+        self._save()
+        return True
+
+    def _finish(self, task: dict, archive: bool = True):
+        """Mark done; one-time tasks leave the active schedule for the archive."""
+        task["done"] = True
+        self._fired.pop(task["id"], None)
+        if not _recurring(task):
+            del self._by_id[task["id"]]
+            self._trigger_ts.pop(task["id"], None)
+            self._tasks.remove(task)
+            if archive:
+                self._to_archive.append(task)
 
     def remove(self, task_id: str) -> bool:
         """Remove a task from the schedule entirely."""
-        before = len(self._tasks)
-        self._tasks = [t for t in self._tasks if t["id"] != task_id]
-        if len(self._tasks) < before:
-            self._save()
-            return True
-        return False
+        task = self._by_id.pop(task_id, None)
+        if task is None:
+            return False
+        self._trigger_ts.pop(task_id, None)
+        self._crons.pop(task_id, None)
+        self._tasks.remove(task)
+        self._fired.pop(task_id, None)
+        self._contested.pop(task_id, None)
+        with contextlib.suppress(OSError):
+            os.remove(self._history(task_id).path)
+        self._save()
+        return True
+
+    # ── Run history ─────────────────────────────────────────────────
+
+    def _history(self, task) -> RunHistory:
+        task_id = task["id"] if isinstance(task, dict) else task
+        return RunHistory(os.path.join(self.history_dir, f"{task_id}.ring"))
+
+    def record_run(self, task, start: float, end: float,
+                   status: str = "ok", budget: Optional[float] = None):
+        """
+        Add one run to the task's history.
+
+        start/end: epoch seconds
+        status: 'ok', 'error' or 'timeout'
+        budget: allowed seconds; a longer run (or a timeout) is an overrun
+        """
+        if budget is None and isinstance(task, dict):
+            budget = task.get("budget_seconds")
+        overrun = status == "timeout" or (budget is not None
+                                          and end - start > budget)
+        self._history(task).append(start, end, status, overrun)
+
+    def record_result(self, task_id: str, result: dict) -> bool:
+        """
+        Store a run's result as the task's 'last_result' and save. One-time
+        tasks are marked done. Returns False if the task no longer exists.
+        """
+        task = self._by_id.get(task_id)
+        if task is None:
+            return False
+        task["last_result"] = result
+        if not _recurring(task):
+            return self.mark_done(task_id)
+        self._save()
+        return True
+
+    @contextlib.contextmanager
+    def timed(self, task, budget: Optional[float] = None):
+        """Time the enclosed block and record it as one run of `task`."""
+        start = time.time()
+        status = "error"
+        try:
+            yield
+            status = "ok"
+        finally:
+            self.record_run(task, start, time.time(), status, budget)
+
+    def history(self, task, n: Optional[int] = None) -> list[dict]:
+        """Recorded runs of a task (task dict or id), oldest first."""
+        runs = self._history(task).runs()
+        return runs[-n:] if n else runs
+
+    def stats(self, task) -> dict:
+        """
+        Duration statistics over the task's recorded runs: count,
+        p50/p95/max/mean seconds, overruns, errors and timeouts.
+        """
+        runs = self.history(task)
+        if not runs:
+            return {"runs": 0}
+        durations = sorted(r["duration"] for r in runs)
+        return {
+            "runs": len(runs),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": durations[-1],
+            "mean": round(sum(durations) / len(durations), 3),
+            "overruns": sum(r["overrun"] for r in runs),
+            "errors": sum(r["status"] == "error" for r in runs),
+            "timeouts": sum(r["status"] == "timeout" for r in runs),
+            "last_end": runs[-1]["end"],
+        }
+
+    def list_archived(self, n: Optional[int] = None) -> list[dict]:
+        """Return finished one-time tasks from the archive (last n if given)."""
+        tasks = []
+        try:
+            with open(self.archive_file) as f:
+                for line in f:
+                    if line.strip():
+                        tasks.append(json.loads(line))
+        except (OSError, json.JSONDecodeError):
+            pass
+        tasks += self._to_archive
+        return tasks if n is None else tasks[-n:]
 
     def list_pending(self) -> list[dict]:
         """Return all non-done tasks."""
-        return [t for t in self._tasks if not t.get("done") or
-                t["type"] in ("loop_interval", "time_interval")]
+        return [t for t in self._tasks if not t.get("done") or _recurring(t)]
 
     def summary(self) -> str:
         """Human-readable summary of scheduled tasks."""
@@ -227,7 +884,12 @@ class TaskScheduler:
         lines = []
         for t in tasks:
             if t["type"] == "datetime":
-                lines.append(f"  [{t['id']}] {t['name']} — at {t['trigger']} | {t['description']}")
+                every = f" (every {t.get('repeat_hours') or 24}h)" if t.get("repeat") else ""
+                lines.append(f"  [{t['id']}] {t['name']} — at {t['trigger']}{every} | {t['description']}")
+            elif t["type"] == "cron":
+                next_ts = t.get("next_run_ts")
+                next_str = time.strftime("%m-%d %H:%M", time.localtime(next_ts)) if next_ts else "never"
+                lines.append(f"  [{t['id']}] {t['name']} — cron '{t['expr']}' (next: {next_str}) | {t['description']}")
             elif t["type"] == "loop_once":
                 lines.append(f"  [{t['id']}] {t['name']} — at loop #{t['trigger_loop']} | {t['description']}")
             elif t["type"] == "loop_interval":
@@ -237,4 +899,233 @@ class TaskScheduler:
                 next_ts = t.get("next_run_ts", 0)
                 next_str = time.strftime("%H:%M", time.localtime(next_ts)) if next_ts else "?"
                 lines.append(f"  [{t['id']}] {t['name']} — every {t['interval_seconds']/3600:.1f}h (next: {next_str}) | {t['description']}")
+            if t.get("deferrals"):
+                lines[-1] += self._deferral_note(t)
         return "\n".join(lines)
+
+    @staticmethod
+    def _deferral_note(t: dict) -> str:
+        if t["type"] in TIME_TYPES:
+            delayed = f"{t.get('defer_seconds', 0) / 60:.0f}m"
+        else:
+            delayed = f"{t.get('defer_loops', 0)} loops"
+        note = f" [{t['cost']}: deferred {t['deferrals']}x, {delayed} total"
+        if "defer_to" in t:
+            if t["type"] in TIME_TYPES:
+                note += ", until " + time.strftime("%H:%M", time.localtime(t["defer_to"]))
+            else:
+                note += f", until loop #{t['defer_to']}"
+        return note + "]"
+
+
+OUTPUT_TAIL_CHARS = 2000
+
+
+class TaskExecutor:
+    """
+    Run due scheduled tasks on a worker pool instead of inline.
+
+    Each task name is bound to a Python callable (run in a worker
+    thread) or a command line (run as a subprocess from a worker thread,
+    killed when it overruns). Per-name concurrency limits stop a slow
+    task piling up; firings over the limit are skipped and counted.
+    Every run is added to the task's run history, with the handler's
+    timeout as its budget.
+
+    The scheduler itself is not thread-safe, so workers only queue their
+    results — collect(), called from the loop, writes them back into
+    the task's state as 'last_result'.
+    """
+
+    def __init__(self, scheduler: TaskScheduler, max_workers: int = 4):
+        self.scheduler = scheduler
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="meridian-task")
+        self._handlers: dict[str, dict] = {}
+        self._running: dict[str, int] = {}
+        self._in_flight: dict[int, dict] = {}   # run id -> run info
+        self._next_run_id = 0
+        self._results: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, fn: Optional[Callable] = None,
+                 command: Optional[Union[str, list]] = None,
+                 timeout: float = 300, max_concurrency: int = 1):
+        """
+        Bind a task name to a callable or a command line.
+
+        fn: called with the task dict; its return value becomes the output
+        command: shell string or argv list, run with the given timeout
+        max_concurrency: how many runs of this name may be in flight at once
+        """
+        if (fn is None) == (command is None):
+            raise ValueError("register() needs exactly one of fn or command")
+        self._handlers[name] = {
+            "fn": fn,
+            "command": command,
+            "timeout": timeout,
+            "max_concurrency": max_concurrency,
+        }
+
+    def run_due(self, current_loop: int = 0) -> list[dict]:
+        """
+        Fetch due tasks and dispatch those with a registered handler.
+
+        Returns the due tasks that have no handler, for inline handling.
+        """
+        self.collect()
+        unhandled = []
+        for task in self.scheduler.get_due(current_loop):
+            if task["name"] in self._handlers:
+                self.dispatch(task)
+            else:
+                unhandled.append(task)
+        return unhandled
+
+    def dispatch(self, task: dict) -> bool:
+        """Submit one task to the pool. Returns False if it was skipped."""
+        name = task["name"]
+        handler = self._handlers[name]
+        if not _recurring(task) and any(
+                run["task"] is task for run in self._in_flight.values()):
+            return False  # one-time task still running from an earlier call
+        with self._lock:
+            if self._running.get(name, 0) >= handler["max_concurrency"]:
+                task["skipped"] = task.get("skipped", 0) + 1
+                return False
+            self._running[name] = self._running.get(name, 0) + 1
+        run_id = self._next_run_id
+        self._next_run_id += 1
+        self._in_flight[run_id] = {
+            "task": task,
+            "name": name,
+            "started": time.time(),
+            "deadline": time.monotonic() + handler["timeout"],
+            "timed_out": False,
+        }
+        self._pool.submit(self._run, run_id, task, handler)
+        return True
+
+    def _run(self, run_id: int, task: dict, handler: dict):
+        started = time.time()
+        t0 = time.monotonic()
+        result = {"started": time.strftime("%Y-%m-%d %H:%M:%S",
+                                           time.localtime(started))}
+        try:
+            if handler["command"] is not None:
+                cmd = handler["command"]
+                # Own session, so a timeout kills the whole process group,
+                # not just the shell in front of a pipeline
+                proc = subprocess.Popen(cmd, shell=isinstance(cmd, str),
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, text=True,
+                                        start_new_session=True)
+                try:
+                    out, err = proc.communicate(timeout=handler["timeout"])
+                except subprocess.TimeoutExpired:
+                    with contextlib.suppress(ProcessLookupError):
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    out, _ = proc.communicate()
+                    raise subprocess.TimeoutExpired(cmd, handler["timeout"], out)
+                result["exit_code"] = proc.returncode
+                result["status"] = "ok" if proc.returncode == 0 else "error"
+                output = out + err
+            else:
+                output = handler["fn"](task)
+                output = "" if output is None else str(output)
+                result["exit_code"] = 0
+                result["status"] = "ok"
+        except subprocess.TimeoutExpired as e:
+            result["exit_code"] = -1
+            result["status"] = "timeout"
+            output = (e.stdout or "") if isinstance(e.stdout, str) else ""
+        except Exception:
+            result["exit_code"] = 1
+            result["status"] = "error"
+            output = traceback.format_exc()
+        result["duration"] = round(time.monotonic() - t0, 3)
+        result["output_tail"] = output[-OUTPUT_TAIL_CHARS:]
+        result["ended"] = time.time()
+        self._results.put((run_id, result))
+
+    def collect(self) -> list[dict]:
+        """
+        Record finished (and overdue) runs into the schedule. Returns the
+        results recorded in this call.
+
+        A callable that overruns its timeout cannot be killed; it is
+        reported as 'timeout' once its deadline passes and keeps its
+        concurrency slot until it actually returns.
+        """
+        recorded = []
+        with self.scheduler.batch():
+            while True:
+                try:
+                    run_id, result = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                run = self._in_flight.pop(run_id)
+                with self._lock:
+                    self._running[run["name"]] -= 1
+                if run["timed_out"]:
+                    continue  # already reported
+                self._record(run, result)
+                recorded.append(result)
+
+            now = time.monotonic()
+            for run in self._in_flight.values():
+                if not run["timed_out"] and now > run["deadline"]:
+                    run["timed_out"] = True
+                    result = {
+                        "status": "timeout",
+                        "exit_code": -1,
+                        "duration": self._handlers[run["name"]]["timeout"],
+                        "output_tail": "",
+                        "ended": time.time(),
+                    }
+                    self._record(run, result)
+                    recorded.append(result)
+        return recorded
+
+    def _record(self, run: dict, result: dict):
+        task = run["task"]
+        self.scheduler.record_run(task, run["started"], result.pop("ended"),
+                                  result["status"],
+                                  self._handlers[run["name"]]["timeout"])
+        self.scheduler.record_result(task["id"], result)
+
+    def running(self) -> dict[str, int]:
+        """Number of in-flight runs per task name."""
+        with self._lock:
+            return {k: v for k, v in self._running.items() if v}
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; optionally wait for running tasks, then collect."""
+        self._pool.shutdown(wait=wait)
+        if wait:
+            self.collect()
+
+
+if __name__ == "__main__":
+    # Benchmark: python3 -m meridian.scheduler [N]
+    import random
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    fields = [
+        ["*", "*/5", "*/15", "0", "30", "0,30", "10-50/10"],
+        ["*", "9-17", "*/2", "0", "6,18", "22"],
+        ["*", "1", "15", "1-7", "*/10", "31"],
+        ["*", "*/3", "1", "jan-jun", "12"],
+        ["*", "1-5", "mon-fri", "0", "sat,sun", "3"],
+    ]
+    exprs = [" ".join(rng.choice(f) for f in fields) for _ in range(n)]
+    t0 = time.perf_counter()
+    compiled = [CronExpr(e) for e in exprs]
+    t1 = time.perf_counter()
+    now = time.time()
+    nexts = [c.next_after(now) for c in compiled]
+    t2 = time.perf_counter()
+    print(f"{n} cron expressions: compile {(t1 - t0) * 1000:.1f} ms, "
+          f"next-fire {(t2 - t1) * 1000:.1f} ms "
+          f"({(t2 - t1) / n * 1e6:.1f} us each)")
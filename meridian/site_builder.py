@@ -0,0 +1,277 @@
+"""
+meridian.site_builder — Incremental static site for poems and journals
+
+Builds the writing section of the website from the journal catalogue
+instead of regex-patching one ever-growing index.html:
+
+  writing/index.html        newest entries, with counts
+  writing/page-N.html       archive pages, oldest first, PER_PAGE each
+  writing/<poem-045>.html   one permalink page per entry
+  writing/feed.xml          Atom feed of the newest entries
+
+Each entry is rendered once into an HTML fragment cached under
+.catalogue/fragments/, keyed by its content hash, id, date and loop. Every output page has
+a signature (the hashes and ids it is made of). A build rewrites only
+pages whose signature changed. Archive pages are filled oldest-first,
+so a new entry touches the index, the last archive page, the feed, its
+own permalink and its predecessor's (for the 'next' link). The
+manifest also records which fragments are in use; a build deletes the
+ones an edit, date or loop change left behind.
+
+Usage:
+    from meridian.site_builder import SiteBuilder
+
+    site = SiteBuilder('/home/joel/autonomous-ai')
+    written = site.build()     # list of pages actually rewritten
+"""
+
+import hashlib
+import html
+import json
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from .journal import BASE_DIR, KINDS, Catalogue
+
+PER_PAGE = 20
+FEED_ENTRIES = 20
+TEMPLATE_VERSION = '1'   # bump to re-render every fragment and page
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>{title}</title>
+  <link rel="stylesheet" href="../style.css">
+  <link rel="alternate" type="application/atom+xml" href="feed.xml">
+</head>
+<body>
+  <main>
+    <header><h1><a href="index.html">{site_title}</a></h1>{nav}</header>
+{body}
+  </main>
+</body>
+</html>
+'''
+
+ARTICLE = '''      <article id="{id}">
+        <div class="entry-meta">{kind} — {date}{loop}</div>
+        <h2><a href="{id}.html">{title}</a></h2>
+        <pre>
+{content}
+</pre>
+      </article>
+'''
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _signature(*parts) -> str:
+    return hashlib.sha1(json.dumps([TEMPLATE_VERSION, *parts]).encode()).hexdigest()
+
+
+def _key(rec: dict) -> list:
+    """Everything an entry's rendered fragment depends on."""
+    return [rec['id'], rec['hash'], rec['date'], rec.get('loop')]
+
+
+class SiteBuilder:
+    """
+    Render the catalogue into static pages, rewriting only what changed.
+
+    base_dir: directory holding poem-*.md / journal-*.md
+    out_dir: where the pages go (default: <base_dir>/website/writing)
+    """
+
+    def __init__(self, base_dir: str = BASE_DIR, out_dir: Optional[str] = None,
+                 site_title: str = 'KometzRobot — Writing',
+                 site_url: str = 'https://kometzrobot.github.io/writing',
+                 catalogue: Optional[Catalogue] = None):
+        self.base_dir = base_dir
+        self.out_dir = out_dir or os.path.join(base_dir, 'website', 'writing')
+        self.site_title = site_title
+        self.site_url = site_url.rstrip('/')
+        self.catalogue = catalogue or Catalogue(base_dir)
+        state_dir = os.path.dirname(self.catalogue.path)
+        self.fragment_dir = os.path.join(state_dir, 'fragments')
+        self.manifest_path = os.path.join(state_dir, 'site-manifest.json')
+        os.makedirs(self.fragment_dir, exist_ok=True)
+        os.makedirs(self.out_dir, exist_ok=True)
+
+    # ── Inputs ──────────────────────────────────────────────────────
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'order': [], 'pages': {}}
+
+    def _ordered(self, manifest: dict) -> List[dict]:
+        """
+        Entries in site order: the order they were first built in, so
+        archive pages keep their contents. New entries go at the end,
+        oldest file first.
+        """
+        recs = {f"{kind}-{rec['number']:03d}": rec
+                for kind in KINDS for rec in self.catalogue.entries(kind)}
+        order = [i for i in manifest['order'] if i in recs]
+        known = set(order)
+        order += sorted((i for i in recs if i not in known),
+                        key=lambda i: (recs[i]['mtime_ns'], i))
+        manifest['order'] = order
+        return [dict(recs[i], id=i, kind=i.split('-')[0]) for i in order]
+
+    def fragment(self, rec: dict) -> str:
+        """The entry's <article>, rendered once per content hash, id, date and loop."""
+        path = self._fragment_path(_signature('fragment', _key(rec)))
+        try:
+            with open(path) as f:
+                return f.read()
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(self.base_dir, rec['file'])) as f:
+                text = f.read()
+        except OSError:
+            text = ''
+        body = text.partition('\n')[2].strip('\n')
+        frag = ARTICLE.format(
+            id=rec['id'], kind=rec['kind'].capitalize(), date=rec['date'],
+            loop=f" — Loop #{rec['loop']}" if rec.get('loop') else '',
+            title=html.escape(rec['title']), content=html.escape(body))
+        _write_atomic(path, frag)
+        return frag
+
+    def _fragment_path(self, sig: str) -> str:
+        return os.path.join(self.fragment_dir, sig + '.html')
+
+    # ── Pages ───────────────────────────────────────────────────────
+
+    def _page(self, title: str, body: str, nav: str = '') -> str:
+        return PAGE.format(title=html.escape(title),
+                           site_title=html.escape(self.site_title),
+                           nav=nav, body=body)
+
+    def _emit(self, manifest: dict, name: str, sig: str, render, written: list):
+        """Write out_dir/name via render() unless its signature is unchanged."""
+        path = os.path.join(self.out_dir, name)
+        if manifest['pages'].get(name) == sig and os.path.exists(path):
+            return
+        _write_atomic(path, render())
+        manifest['pages'][name] = sig
+        written.append(name)
+
+    def build(self) -> List[str]:
+        """Bring the site up to date. Returns the pages that were rewritten."""
+        manifest = self._load_manifest()
+        entries = self._ordered(manifest)
+        written: List[str] = []
+        n_pages = max(1, -(-len(entries) // PER_PAGE))
+
+        def page_link(p: int) -> str:
+            return f'<a href="page-{p}.html">{p}</a>'
+
+        # Index: newest first, with counts
+        counts = {k: sum(e['kind'] == k for e in entries) for k in KINDS}
+        newest = entries[::-1][:PER_PAGE]
+        self._emit(manifest, 'index.html',
+                   _signature('index', counts, n_pages,
+                              [_key(e) for e in newest]),
+                   lambda: self._page(
+                       self.site_title,
+                       ''.join(self.fragment(e) for e in newest),
+                       f"<nav>Poems: {counts['poem']} · Journals: {counts['journal']}"
+                       f" · Archive: {' '.join(page_link(p) for p in range(1, n_pages + 1))}"
+                       "</nav>"),
+                   written)
+
+        # Archive pages, oldest first; only the last one normally changes
+        for p in range(1, n_pages + 1):
+            chunk = entries[(p - 1) * PER_PAGE:p * PER_PAGE]
+            has_next = p < n_pages
+            self._emit(manifest, f'page-{p}.html',
+                       _signature('page', p, has_next,
+                                  [_key(e) for e in chunk]),
+                       lambda chunk=chunk, p=p, has_next=has_next: self._page(
+                           f'{self.site_title} — page {p}',
+                           ''.join(self.fragment(e) for e in chunk),
+                           '<nav>' + (page_link(p - 1) + ' ← ' if p > 1 else '')
+                           + f'page {p}' + (' → ' + page_link(p + 1) if has_next else '')
+                           + '</nav>'),
+                       written)
+
+        # Permalinks, linking to their neighbours
+        for i, e in enumerate(entries):
+            prev_id = entries[i - 1]['id'] if i > 0 else None
+            next_id = entries[i + 1]['id'] if i + 1 < len(entries) else None
+            self._emit(manifest, f"{e['id']}.html",
+                       _signature('entry', _key(e), prev_id, next_id),
+                       lambda e=e, prev_id=prev_id, next_id=next_id: self._page(
+                           e['title'], self.fragment(e),
+                           '<nav>' + (f'<a href="{prev_id}.html">← previous</a> '
+                                      if prev_id else '')
+                           + (f'<a href="{next_id}.html">next →</a>' if next_id else '')
+                           + '</nav>'),
+                       written)
+
+        self._emit(manifest, 'feed.xml',
+                   _signature('feed', [_key(e) for e in newest[:FEED_ENTRIES]]),
+                   lambda: self._feed(newest[:FEED_ENTRIES]), written)
+
+        # Drop pages of entries or archive pages that no longer exist
+        live = {'index.html', 'feed.xml'} | {f'page-{p}.html' for p in range(1, n_pages + 1)} \
+            | {f"{e['id']}.html" for e in entries}
+        for name in [n for n in manifest['pages'] if n not in live]:
+            del manifest['pages'][name]
+            try:
+                os.remove(os.path.join(self.out_dir, name))
+            except OSError:
+                pass
+            written.append(name)
+
+        # Drop fragments no entry renders any more. A manifest from before
+        # they were tracked gets one sweep of the directory instead.
+        fragments = {_signature('fragment', _key(e)) for e in entries}
+        known = manifest.get('fragments')
+        if known is None:
+            known = [n[:-len('.html')] for n in os.listdir(self.fragment_dir)
+                     if n.endswith('.html')]
+        for sig in set(known) - fragments:
+            try:
+                os.remove(self._fragment_path(sig))
+            except OSError:
+                pass
+        manifest['fragments'] = sorted(fragments)
+
+        _write_atomic(self.manifest_path, json.dumps(manifest))
+        return written
+
+    def _feed(self, entries: List[dict]) -> str:
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        items = []
+        for e in entries:
+            updated = datetime.fromtimestamp(e['mtime_ns'] / 1e9, timezone.utc) \
+                .strftime('%Y-%m-%dT%H:%M:%SZ')
+            link = f"{self.site_url}/{e['id']}.html"
+            items.append(
+                '  <entry>\n'
+                f"    <title>{html.escape(e['title'])}</title>\n"
+                f'    <link href="{link}"/>\n'
+                f'    <id>{link}</id>\n'
+                f'    <updated>{updated}</updated>\n'
+                f"    <content type=\"html\">{html.escape(self.fragment(e))}</content>\n"
+                '  </entry>\n')
+        return ('<?xml version="1.0" encoding="utf-8"?>\n'
+                '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+                f'  <title>{html.escape(self.site_title)}</title>\n'
+                f'  <link href="{self.site_url}/"/>\n'
+                f'  <id>{self.site_url}/</id>\n'
+                f'  <updated>{now}</updated>\n'
+                + ''.join(items) + '</feed>\n')
@@ -0,0 +1,432 @@
+"""
+meridian.supervisor — Start and keep alive the services around the loop
+
+Replaces the fixed sleeps and `pgrep -f` checks of startup.sh and
+watchdog-status.sh. Services start as soon as the services they depend
+on pass a readiness probe (a TCP port accepting connections, a file
+existing or being fresh), so independent ones come up in parallel.
+Children are tracked by PID, through a pidfd where the kernel has them,
+so a crash is noticed the moment it happens. The service is restarted
+at once, then with exponential back-off if it keeps crashing.
+
+Each service's PID is kept in <state_dir>/<name>.pid. A supervisor that
+is itself restarted adopts services that are still running rather than
+starting duplicates, and leaves them running when it exits. Without a
+pidfile (services startup.sh launched before the first rollout) it looks
+for a process whose /proc/<pid>/cmdline matches the service's argv.
+A oneshot that keeps failing is given up on after max_retries restarts.
+
+Usage:
+    from meridian.supervisor import Supervisor, Service, port_open
+
+    sup = Supervisor([
+        Service('http', ['python3', '-m', 'http.server', '8080'],
+                cwd='~/autonomous-ai/website', ready=port_open(8080)),
+        Service('tunnel', ['lt', '--port', '8080'], depends_on=['http']),
+    ], state_dir='~/autonomous-ai/.supervisor')
+    sup.run()            # blocks; SIGTERM/SIGINT to stop supervising
+
+    # Or the standard KometzRobot set:
+    python3 -m meridian.supervisor [working_dir]
+"""
+
+import contextlib
+import heapq
+import os
+import select
+import signal
+import socket
+import subprocess
+import time
+from typing import Callable, Optional
+
+# ── Readiness probes ─────────────────────────────────────────────────
+
+
+def port_open(port: int, host: str = '127.0.0.1') -> Callable[[], bool]:
+    """Ready once something accepts TCP connections on host:port."""
+    def probe() -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+    return probe
+
+
+def file_exists(path: str) -> Callable[[], bool]:
+    """Ready once `path` exists (e.g. the X server socket)."""
+    path = os.path.expanduser(path)
+    return lambda: os.path.exists(path)
+
+
+def file_fresh(path: str, max_age: float = 600) -> Callable[[], bool]:
+    """Ready while `path` was modified in the last max_age seconds (a heartbeat)."""
+    path = os.path.expanduser(path)
+
+    def probe() -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) < max_age
+        except OSError:
+            return False
+    return probe
+
+
+class Service:
+    """
+    One supervised process.
+
+    argv: command to run; None for a probe-only service (e.g. 'desktop')
+    ready: readiness probe; without one a service is ready once spawned
+    depends_on: services that must be ready before this one starts
+    oneshot: runs to completion once (exit 0 counts as ready, no restart)
+    max_retries: restarts of a failing oneshot before it is marked failed
+    ready_timeout: after this many seconds dependents start anyway
+    """
+
+    def __init__(self, name: str, argv: Optional[list] = None,
+                 cwd: Optional[str] = None, env: Optional[dict] = None,
+                 log: Optional[str] = None,
+                 ready: Optional[Callable[[], bool]] = None,
+                 depends_on: Optional[list] = None,
+                 oneshot: bool = False, max_retries: int = 3,
+                 ready_timeout: float = 60,
+                 backoff: float = 1.0, max_backoff: float = 300):
+        self.name = name
+        self.argv = argv
+        self.cwd = os.path.expanduser(cwd) if cwd else None
+        self.env = env or {}
+        self.log = os.path.expanduser(log) if log else None
+        self.ready = ready
+        self.depends_on = depends_on or []
+        self.oneshot = oneshot
+        self.max_retries = max_retries
+        self.ready_timeout = ready_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.state = 'waiting'   # waiting/starting/ready/backoff/done/failed
+        self.pid: Optional[int] = None
+        self.proc: Optional[subprocess.Popen] = None
+        self.pidfd: Optional[int] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restarts = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state in ('ready', 'done')
+
+
+STABLE_SECONDS = 60     # a run this long resets the back-off
+TICK = 0.2              # probe interval while something is starting
+
+
+class Supervisor:
+    """Start services in dependency order and restart them when they die."""
+
+    def __init__(self, services: list, state_dir: str = '~/autonomous-ai/.supervisor',
+                 log_path: Optional[str] = None):
+        self.services = {s.name: s for s in services}
+        for s in services:
+            missing = [d for d in s.depends_on if d not in self.services]
+            if missing:
+                raise ValueError(f'{s.name} depends on unknown service(s): {missing}')
+        self.state_dir = os.path.expanduser(state_dir)
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.log_path = os.path.expanduser(log_path) if log_path else None
+        self._restarts: list = []   # heap of (due, name)
+        self._poll = select.poll()
+        self._by_fd: dict[int, Service] = {}
+        self._stopping = False
+
+    def log(self, message: str):
+        line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+        print(line, flush=True)
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(line + '\n')
+            except OSError:
+                pass
+
+    # ── Process tracking ────────────────────────────────────────────
+
+    def _pidfile(self, svc: Service) -> str:
+        return os.path.join(self.state_dir, f'{svc.name}.pid')
+
+    @staticmethod
+    def _runs(pid: int, svc: Service) -> bool:
+        """Whether process `pid` is running svc's command (same program name and args)."""
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = [a.decode(errors='replace')
+                           for a in f.read().rstrip(b'\0').split(b'\0')]
+        except OSError:
+            return False
+        argv = [str(a) for a in svc.argv]
+        return bool(cmdline) and cmdline[1:] == argv[1:] \
+            and os.path.basename(cmdline[0]) == os.path.basename(argv[0])
+
+    def _find_running(self, svc: Service) -> Optional[int]:
+        """PID of an unsupervised process running svc's command, if any."""
+        claimed = {s.pid for s in self.services.values() if s.pid is not None}
+        for name in os.listdir('/proc'):
+            if name.isdigit() and int(name) != os.getpid() \
+                    and int(name) not in claimed and self._runs(int(name), svc):
+                return int(name)
+        return None
+
+    def _adopt(self, svc: Service) -> bool:
+        """
+        Pick up a still-running instance: the one in the pidfile, or
+        failing that one found by its command line.
+        """
+        try:
+            with open(self._pidfile(svc)) as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            pid = None
+        if pid is None or not self._runs(pid, svc):   # pid may have been reused
+            pid = self._find_running(svc)
+            if pid is None:
+                return False
+            with open(self._pidfile(svc), 'w') as f:
+                f.write(f'{pid}\n')
+        svc.pid, svc.proc = pid, None
+        self._watch(svc)
+        self.log(f'{svc.name}: adopted running instance (PID {pid})')
+        return True
+
+    def _spawn(self, svc: Service):
+        out = open(svc.log, 'ab') if svc.log else subprocess.DEVNULL
+        try:
+            svc.proc = subprocess.Popen(
+                [str(a) for a in svc.argv], cwd=svc.cwd,
+                env={**os.environ, **svc.env}, stdin=subprocess.DEVNULL,
+                stdout=out, stderr=subprocess.STDOUT, start_new_session=True)
+        finally:
+            if out is not subprocess.DEVNULL:
+                out.close()
+        svc.pid = svc.proc.pid
+        with open(self._pidfile(svc), 'w') as f:
+            f.write(f'{svc.pid}\n')
+        self._watch(svc)
+        self.log(f'{svc.name}: started (PID {svc.pid})')
+
+    def _watch(self, svc: Service):
+        svc.started_at = time.monotonic()
+        svc.state = 'starting'
+        try:
+            svc.pidfd = os.pidfd_open(svc.pid)
+        except (AttributeError, OSError):
+            svc.pidfd = None  # no pidfds here: fall back to polling each tick
+            return
+        self._by_fd[svc.pidfd] = svc
+        self._poll.register(svc.pidfd, select.POLLIN)
+
+    def _unwatch(self, svc: Service):
+        if svc.pidfd is not None:
+            self._poll.unregister(svc.pidfd)
+            del self._by_fd[svc.pidfd]
+            os.close(svc.pidfd)
+            svc.pidfd = None
+
+    def _exit_status(self, svc: Service) -> Optional[int]:
+        """Exit code if the process has ended, else None (-1 if unknown)."""
+        if svc.proc is not None:
+            return svc.proc.poll()
+        try:
+            os.kill(svc.pid, 0)   # adopted, not our child: can't reap it
+            return None
+        except ProcessLookupError:
+            return -1
+        except PermissionError:
+            return None
+
+    # ── Lifecycle ───────────────────────────────────────────────────
+
+    def _start(self, svc: Service):
+        if svc.argv is None:
+            svc.state = 'starting'
+            svc.started_at = time.monotonic()
+            return
+        if not self._adopt(svc):
+            try:
+                self._spawn(svc)
+            except OSError as e:
+                self.log(f'{svc.name}: failed to start: {e}')
+                self._schedule_restart(svc)
+
+    def _schedule_restart(self, svc: Service):
+        # First crash: restart at once; then 1x, 2x, 4x ... backoff
+        delay = 0 if not svc.failures else min(
+            svc.backoff * 2 ** (svc.failures - 1), svc.max_backoff)
+        svc.failures += 1
+        svc.state = 'backoff'
+        heapq.heappush(self._restarts, (time.monotonic() + delay, svc.name))
+        self.log(f'{svc.name}: restarting in {delay:.1f}s')
+
+    def _on_exit(self, svc: Service, code: int):
+        self._unwatch(svc)
+        ran = time.monotonic() - svc.started_at
+        if svc.oneshot and code == 0:
+            svc.state = 'done'
+            self.log(f'{svc.name}: finished')
+            return
+        self.log(f'{svc.name}: exited with status {code} after {ran:.0f}s')
+        if self._stopping:
+            svc.state = 'failed'
+            return
+        if svc.oneshot and svc.restarts >= svc.max_retries:
+            svc.state = 'failed'
+            self.log(f'{svc.name}: giving up after {svc.restarts} retries')
+            return
+        if ran >= STABLE_SECONDS:
+            svc.failures = 0
+        svc.restarts += 1
+        self._schedule_restart(svc)
+
+    def step(self, timeout: float = 1.0):
+        """One pass: start what can start, probe, reap and restart."""
+        now = time.monotonic()
+        for svc in self.services.values():
+            if svc.state == 'waiting' and all(
+                    self.services[d].is_ready for d in svc.depends_on):
+                self._start(svc)
+
+        while self._restarts and self._restarts[0][0] <= now:
+            _, name = heapq.heappop(self._restarts)
+            svc = self.services[name]
+            if svc.state == 'backoff':
+                self._start(svc)
+
+        starting = False
+        for svc in self.services.values():
+            if svc.state != 'starting':
+                continue
+            if (svc.ready is None and not svc.oneshot) or (svc.ready and svc.ready()):
+                svc.state = 'ready'
+                self.log(f'{svc.name}: ready after '
+                         f'{time.monotonic() - svc.started_at:.1f}s')
+            elif time.monotonic() - svc.started_at > svc.ready_timeout:
+                svc.state = 'ready'
+                self.log(f'{svc.name}: not ready after {svc.ready_timeout:.0f}s; '
+                         'starting dependents anyway')
+            else:
+                starting = True
+
+        # Wait for a child to exit, or until the next probe/restart is due
+        wait = TICK if starting or any(
+            s.state == 'waiting' for s in self.services.values()) else timeout
+        if self._restarts:
+            wait = min(wait, max(0.0, self._restarts[0][0] - time.monotonic()))
+        polled = [s for s in self.services.values()
+                  if s.pid is not None and s.pidfd is None
+                  and s.state in ('starting', 'ready')]
+        if polled:
+            wait = min(wait, TICK)
+        for fd, _ in self._poll.poll(wait * 1000):
+            svc = self._by_fd[fd]
+            code = self._exit_status(svc)
+            self._on_exit(svc, -1 if code is None else code)
+        for svc in polled:
+            code = self._exit_status(svc)
+            if code is not None:
+                self._on_exit(svc, code)
+
+    def run(self):
+        """Supervise until SIGTERM or SIGINT. Services are left running."""
+        def stop(*_):
+            self._stopping = True
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        with open(os.path.join(self.state_dir, 'supervisor.pid'), 'w') as f:
+            f.write(f'{os.getpid()}\n')
+        self.log(f'=== SUPERVISOR STARTED ({len(self.services)} services) ===')
+        t0 = time.monotonic()
+        booted = False
+        while not self._stopping:
+            self.step()
+            if not booted and all(s.is_ready or s.state in ('backoff', 'failed')
+                                  for s in self.services.values()):
+                booted = True
+                self.log(f'=== STARTUP COMPLETE in {time.monotonic() - t0:.1f}s ===')
+        self.log('=== SUPERVISOR STOPPED ===')
+
+    def stop_all(self, timeout: float = 10):
+        """Terminate every supervised process (SIGTERM, then SIGKILL)."""
+        self._stopping = True
+        alive = [s for s in self.services.values()
+                 if s.pid is not None and self._exit_status(s) is None]
+        for s in alive:
+            self._kill(s, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while alive and time.monotonic() < deadline:
+            time.sleep(TICK)
+            alive = [s for s in alive if self._exit_status(s) is None]
+        for s in alive:
+            self._kill(s, signal.SIGKILL)
+        for s in self.services.values():
+            if s.pid is not None:
+                self._unwatch(s)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._pidfile(s))
+
+    @staticmethod
+    def _kill(svc: Service, sig: int):
+        # Services we spawned lead their own session; ones startup.sh left
+        # share its process group, so only the process itself is signalled
+        with contextlib.suppress(ProcessLookupError):
+            if os.getpgid(svc.pid) == svc.pid:
+                os.killpg(svc.pid, sig)
+            else:
+                os.kill(svc.pid, sig)
+
+    def status(self) -> dict:
+        """name -> {'state', 'pid', 'restarts'}."""
+        return {s.name: {'state': s.state, 'pid': s.pid, 'restarts': s.restarts}
+                for s in self.services.values()}
+
+
+def default_services(working_dir: str = '~/autonomous-ai',
+                     python: str = '~/miniconda3/bin/python3') -> list:
+    """The services startup.sh used to bring up, with readiness probes."""
+    wd = os.path.expanduser(working_dir)
+    py = os.path.expanduser(python)
+    display = {'DISPLAY': ':0'}
+    for xauth in ('/run/user/1000/gdm/Xauthority', os.path.expanduser('~/.Xauthority')):
+        if os.path.exists(xauth):
+            display['XAUTHORITY'] = xauth
+            break
+    return [
+        Service('desktop', ready=file_exists('/tmp/.X11-unix/X0'),
+                ready_timeout=120),
+        # The bridge unlocks its vault through gnome-keyring, which comes up
+        # with the desktop session (startup.sh slept 20s for it)
+        Service('keyring', ready=file_exists('/run/user/1000/keyring/control'),
+                depends_on=['desktop'], ready_timeout=30),
+        Service('bridge', ['/snap/bin/protonmail-bridge', '--noninteractive'],
+                env={'DBUS_SESSION_BUS_ADDRESS': 'unix:path=/run/user/1000/bus'},
+                log=f'{wd}/bridge.log', ready=port_open(1143),
+                depends_on=['keyring']),
+        Service('http', [py, '-m', 'http.server', '8080'], cwd=f'{wd}/website',
+                log=f'{wd}/http-server.log', ready=port_open(8080)),
+        Service('tunnel', ['/usr/bin/lt', '--port', '8080', '--subdomain', 'kometzrobot'],
+                log=f'{wd}/tunnel.log', depends_on=['http']),
+        Service('irc-bot', [py, f'{wd}/irc-bot.py'], log=f'{wd}/irc-bot.log'),
+        Service('ollama', ['/usr/local/bin/ollama', 'serve'],
+                log=f'{wd}/ollama.log', ready=port_open(11434)),
+        Service('status-display', [py, f'{wd}/status-display-v8.py'], env=display,
+                log=f'{wd}/status-display.log', depends_on=['desktop']),
+        Service('watchdog', ['bash', f'{wd}/watchdog.sh'], oneshot=True,
+                depends_on=['bridge']),
+    ]
+
+
+if __name__ == '__main__':
+    # Supervise the standard services: python3 -m meridian.supervisor [working_dir]
+    import sys
+    wd = sys.argv[1] if len(sys.argv) > 1 else '~/autonomous-ai'
+    Supervisor(default_services(wd), state_dir=f'{wd}/.supervisor',
+               log_path=f'{wd}/startup.log').run()
@@ -95,6 +95,26 @@ class SystemMonitor:
 
         return s
 
+    def get_load(self) -> Dict:
+        """
+        Cheap load snapshot (no subprocesses): load1, load5, cpus,
+        ram_avail_mb. Suitable for calling every loop iteration.
+        """
+        s = {'cpus': os.cpu_count() or 1}
+        try:
+            s['load1'], s['load5'], _ = os.getloadavg()
+        except OSError:
+            s['load1'] = s['load5'] = 0.0
+        try:
+            with open('/proc/meminfo') as f:
+                for ln in f:
+                    if ln.startswith('MemAvailable:'):
+                        s['ram_avail_mb'] = int(ln.split()[1]) // 1024
+                        break
+        except OSError:
+            pass
+        return s
+
     def get_top_processes(self, n: int = 20, sort_by: str = 'cpu') -> List[Dict]:
         """Get top N processes sorted by CPU or memory."""
         sort_flag = '-%cpu' if sort_by == 'cpu' else '-%mem'
@@ -0,0 +1,229 @@
+"""
+meridian.thoughts — Inner monologue stream as a fixed-size ring buffer
+
+The thought stream is a binary file of fixed-width slots: a 24-byte
+header (magic, capacity, slot size, sequence number of the next thought)
+followed by `capacity` slots, each holding a timestamp, a length and up
+to slot size - 10 bytes of UTF-8 text. Appending writes one slot and the
+header; reading the last N thoughts reads N slots. Neither ever touches
+the rest of the file, which never grows past its capacity.
+
+Several processes can share the stream — the loop, log-thought.py, the
+status display — since writes take an exclusive flock on the file and
+reads a shared one. A reader that remembers the sequence number can
+follow the stream with read_since() instead of re-reading it.
+
+For readers that only understand text (the status display tails
+/tmp/meridian_thoughts.txt), every write also replaces that file with
+the last TEXT_LINES thoughts as '[HH:MM] text' lines. It is rewritten
+atomically and stays a few KB however long the stream runs.
+
+A background writer is flushed at interpreter exit, so thoughts queued
+just before the loop exits or dies of an exception still reach disk.
+
+Usage:
+    from meridian.thoughts import ThoughtStream
+
+    stream = ThoughtStream()
+    stream.append('Checked email, nothing new.')
+    for line in stream.lines(20):
+        print(line)                      # '[14:05] Checked email, ...'
+
+    # Batch flushes from a background thread (e.g. in the main loop)
+    stream = ThoughtStream(background=True)
+    ...
+    stream.close()
+
+    # Tail from the shell:
+    python3 -m meridian.thoughts [-n 20] [-f]
+"""
+
+import atexit
+import fcntl
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Optional
+
+THOUGHTS_PATH = '/tmp/meridian_thoughts.ring'
+TEXT_PATH = '/tmp/meridian_thoughts.txt'
+TEXT_LINES = 20
+
+
+class ThoughtStream:
+    """
+    Shared, bounded thought log with O(1) append and O(N) last-N reads.
+
+    capacity: number of thoughts kept (older ones are overwritten)
+    slot_size: bytes per thought slot; longer thoughts are truncated
+    background: queue appends and write them in batches from a thread
+    flush_interval: how often the background writer flushes, in seconds
+    text_path: plain-text tail kept alongside the ring (None to skip it)
+    """
+
+    MAGIC = b'MTS1'
+    HEADER = struct.Struct('<4sIIxxxxQ')
+    SLOT_HEAD = struct.Struct('<dH')
+
+    def __init__(self, path: str = THOUGHTS_PATH, capacity: int = 200,
+                 slot_size: int = 512, background: bool = False,
+                 flush_interval: float = 0.5,
+                 text_path: Optional[str] = TEXT_PATH):
+        self.path = path
+        self.text_path = text_path
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if background:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop,
+                                            name='meridian-thoughts', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    # ── Layout ──────────────────────────────────────────────────────
+
+    def _header(self, f) -> tuple[int, int, int]:
+        """(capacity, slot size, next sequence number) of an open stream."""
+        f.seek(0)
+        raw = f.read(self.HEADER.size)
+        if len(raw) == self.HEADER.size:
+            magic, cap, slot, seq = self.HEADER.unpack(raw)
+            if magic == self.MAGIC:
+                return cap, slot, seq
+        return self.capacity, self.slot_size, 0
+
+    def _pack(self, ts: float, text: str, slot: int) -> bytes:
+        data = text.encode('utf-8')[:slot - self.SLOT_HEAD.size]
+        data = data.decode('utf-8', errors='ignore').encode('utf-8')
+        return self.SLOT_HEAD.pack(ts, len(data)) + data
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def append(self, text: str, ts: Optional[float] = None):
+        """Add a thought. With a background writer this only queues it."""
+        item = (ts or time.time(), text.strip())
+        if self._queue is not None:
+            self._queue.put(item)
+        else:
+            self._write([item])
+
+    def _write(self, items: list):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            cap, slot, seq = self._header(f)
+            for ts, text in items[-cap:]:
+                f.seek(self.HEADER.size + (seq % cap) * slot)
+                f.write(self._pack(ts, text, slot))
+                seq += 1
+            f.seek(0)
+            f.write(self.HEADER.pack(self.MAGIC, cap, slot, seq))
+            if self.text_path:
+                self._write_text(self._slots(f, cap, slot, max(0, seq - TEXT_LINES), seq))
+
+    def _write_text(self, thoughts: list):
+        tmp = f'{self.text_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.writelines(self.format(ts, text) + '\n' for ts, text in thoughts)
+        os.replace(tmp, self.text_path)
+
+    def _drain(self) -> list:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write out queued thoughts now (background mode only)."""
+        if self._queue is None:
+            return
+        items = self._drain()
+        if items:
+            try:
+                self._write(items)
+            except OSError as e:
+                print(f'Thought stream error: {e}')
+
+    def close(self):
+        """Stop the background writer after a final flush."""
+        if self._writer is not None:
+            self._stop.set()
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.close)
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    def _slots(self, f, cap: int, slot: int, start: int, end: int) -> list:
+        """(timestamp, text) for sequence numbers start..end-1 of an open stream."""
+        out = []
+        for i in range(max(start, end - cap, 0), end):
+            f.seek(self.HEADER.size + (i % cap) * slot)
+            raw = f.read(slot)
+            ts, n = self.SLOT_HEAD.unpack_from(raw)
+            text = raw[self.SLOT_HEAD.size:self.SLOT_HEAD.size + n]
+            out.append((ts, text.decode('utf-8', errors='replace')))
+        return out
+
+    def read_since(self, seq: int = 0) -> tuple[list, int]:
+        """
+        Thoughts with sequence number >= seq that are still in the ring,
+        as (timestamp, text), plus the sequence number to pass next time.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                cap, slot, end = self._header(f)
+                return self._slots(f, cap, slot, seq, end), end
+        except (OSError, struct.error):
+            return [], seq
+
+    def tail(self, n: int = 20) -> list:
+        """Last n thoughts, oldest first, as (timestamp, text)."""
+        try:
+            with open(self.path, 'rb') as f:
+                _, _, end = self._header(f)
+        except OSError:
+            return []
+        return self.read_since(max(0, end - n))[0]
+
+    @staticmethod
+    def format(ts: float, text: str) -> str:
+        return f"[{time.strftime('%H:%M', time.localtime(ts))}] {text}"
+
+    def lines(self, n: int = 20) -> list:
+        """Last n thoughts as '[HH:MM] text' lines."""
+        return [self.format(ts, text) for ts, text in self.tail(n)]
+
+
+if __name__ == '__main__':
+    # Tail the stream: python3 -m meridian.thoughts [-n N] [-f]
+    import sys
+    args = sys.argv[1:]
+    n = int(args[args.index('-n') + 1]) if '-n' in args else 20
+    stream = ThoughtStream()
+    try:
+        with open(stream.path, 'rb') as f:
+            _, _, seq = stream._header(f)
+    except OSError:
+        seq = 0
+    for ts, text in stream.read_since(max(0, seq - n))[0]:
+        print(stream.format(ts, text))
+    while '-f' in args:
+        time.sleep(1)
+        new, seq = stream.read_since(seq)
+        for ts, text in new:
+            print(stream.format(ts, text), flush=True)
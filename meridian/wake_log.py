@@ -0,0 +1,341 @@
+"""
+meridian.wake_log — Append-only loop log behind wake-state.md
+
+wake-state.md used to be both the record of every loop and the thing the
+next instance reads on wake-up, so it grew every loop and each update
+re-read and rewrote all of it. Here the two are split:
+
+  wake-state-log.jsonl   one JSON line per loop, append-only
+  wake-state.count       current loop number (read once at startup)
+  wake-state-rollup.json hourly / daily / weekly summaries of older loops,
+                         and how far into the log they reach
+  wake-state.md          rendered view: recent loops verbatim, then the
+                         summaries, then whatever hand-written sections
+                         the file already has
+
+A loop costs one appended line, one tiny counter write and a rewrite of
+the (bounded) rendered file — none of it depends on how many loops came
+before. The first time a log is opened next to an existing wake-state.md,
+its loop lines are imported once.
+
+Roll-up is hierarchical and incremental. When the rendered loop block
+goes over its token budget, compact() folds every verbatim loop but the
+last `keep` into hour buckets; beyond HOURS_KEPT hours, hour buckets
+fold into day buckets, beyond DAYS_KEPT days into week buckets, and
+beyond WEEKS_KEPT weeks into a single 'earlier' bucket. Only loops
+logged since the previous roll-up are read — the log offset they start
+at is saved with the summaries. LoopManager triggers this on its own.
+
+Usage:
+    from meridian.wake_log import WakeLog
+
+    log = WakeLog('/home/joel/autonomous-ai/wake-state.md', keep=15)
+    loop = log.loop_count() + 1
+    log.append(loop, 'Checked email, no new messages.')
+    if log.over_budget():
+        log.compact()
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+MARKER = '## Current Status: RUNNING'
+ENTRY_RE = re.compile(r'^- Loop iteration #(\d+)')
+LEGACY_PREFIX = '- [COMPRESSED'  # written by backup/scripts/compress-wake-state.py
+SUMMARY_PREFIXES = (LEGACY_PREFIX, '- [HOUR', '- [DAY', '- [WEEK', '- [EARLIER')
+
+HOURS_KEPT = 24
+DAYS_KEPT = 14
+WEEKS_KEPT = 8
+EVENTS_PER_BUCKET = 5
+
+# (tier, bucket key) for a loop's timestamp
+TIER_KEYS = {
+    'hours': lambda dt: dt.strftime('%Y-%m-%d %H:00'),
+    'days': lambda dt: dt.strftime('%Y-%m-%d'),
+    'weeks': lambda dt: dt.strftime('%G-W%V'),
+}
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _notable(text: str) -> list:
+    """Events worth keeping in a summary: mail handled, things built or pushed."""
+    low = text.lower()
+    events = []
+    if 'new email' in low and 'no new email' not in low:
+        m = re.search(r'email #(\d+)', text, re.IGNORECASE)
+        if m:
+            events.append(f'email #{m.group(1)}')
+    m = re.search(r'[Bb]uilt:\s*([^.]+)', text)
+    if m:
+        events.append(f'built: {m.group(1).strip()[:50]}')
+    m = re.search(r'[Pp]ushed\s+([^(.]+)', text)
+    if m:
+        events.append(f'pushed: {m.group(1).strip()[:40]}')
+    return events
+
+
+def _merge(into: dict, other: dict):
+    into['from'] = min(into['from'], other['from'])
+    into['to'] = max(into['to'], other['to'])
+    into['count'] += other['count']
+    room = EVENTS_PER_BUCKET - len(into['events'])
+    into['events'].extend(e for e in other['events'][:max(room, 0)]
+                          if e not in into['events'])
+
+
+class WakeLog:
+    """
+    Structured, append-only history of loop status lines.
+
+    keep: how many recent loops stay verbatim after a roll-up
+    budget_tokens: roll up once the rendered loop block is estimated
+                   (at ~4 characters a token) to be larger than this
+    """
+
+    def __init__(self, wake_state_path: str, keep: int = 15,
+                 budget_tokens: int = 1500):
+        self.wake_state_path = wake_state_path
+        root, _ = os.path.splitext(wake_state_path)
+        self.log_path = root + '-log.jsonl'
+        self.count_path = root + '.count'
+        self.rollup_path = root + '-rollup.json'
+        self.keep = keep
+        self.budget_tokens = budget_tokens
+        self._block_chars = 0
+        if not os.path.exists(self.log_path):
+            self._import_legacy()
+        self._rollup = self._read_rollup()
+        self._recent = self._read_from(self._rollup['offset'])
+
+    # ── Storage ─────────────────────────────────────────────────────
+
+    def _import_legacy(self):
+        """One-time import of loop lines from a pre-existing wake-state.md."""
+        try:
+            with open(self.wake_state_path) as f:
+                lines = f.read().split('\n')
+        except OSError:
+            lines = []
+        entries = []
+        for line in lines:
+            m = ENTRY_RE.match(line)
+            if m:
+                entries.append({'loop': int(m.group(1)), 'line': line})
+        entries.sort(key=lambda e: e['loop'])  # file is newest-first
+        with open(self.log_path, 'a') as f:
+            for e in entries:
+                f.write(json.dumps(e) + '\n')
+        if entries and not os.path.exists(self.count_path):
+            _write_atomic(self.count_path, f"{entries[-1]['loop']}\n")
+
+    def _read_from(self, offset: int) -> list:
+        """Records from byte `offset` on, as (record, line length in bytes)."""
+        records = []
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break  # torn last line
+                    try:
+                        records.append((json.loads(raw), len(raw)))
+                    except ValueError:
+                        records.append(({}, len(raw)))
+        except OSError:
+            pass
+        return records
+
+    def _read_rollup(self) -> dict:
+        try:
+            with open(self.rollup_path) as f:
+                r = json.load(f)
+        except (OSError, ValueError):
+            r = {}
+        if 'count' in r and 'earlier' not in r:
+            # Single roll-up line from before summaries were tiered
+            r['earlier'] = {'from': r.pop('from'), 'to': r.pop('to'),
+                            'count': r.pop('count'), 'events': []}
+        r.setdefault('offset', 0)
+        for tier in ('hours', 'days', 'weeks'):
+            r.setdefault(tier, [])
+        r.setdefault('earlier', None)
+        return r
+
+    def loop_count(self) -> int:
+        """Current loop number, from the counter file (0 if none yet)."""
+        try:
+            with open(self.count_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            for rec, _ in reversed(self._recent):
+                if 'loop' in rec:
+                    return rec['loop']
+            return 0
+
+    def append(self, loop: int, status: str, context: Optional[str] = None):
+        """Record one loop and re-render wake-state.md."""
+        rec = {'loop': loop, 'ts': datetime.now().isoformat(timespec='seconds'),
+               'status': status}
+        if context:
+            rec['context'] = context
+        line = json.dumps(rec) + '\n'
+        with open(self.log_path, 'a') as f:
+            f.write(line)
+        _write_atomic(self.count_path, f'{loop}\n')
+        self._recent.append((rec, len(line.encode())))
+        self.render()
+
+    def tail(self, n: int) -> list:
+        """Last n records not yet rolled up (at most), oldest first."""
+        return [rec for rec, _ in self._recent[-n:]]
+
+    # ── Roll-up ─────────────────────────────────────────────────────
+
+    def over_budget(self) -> bool:
+        """
+        True when the rendered loop block is past budget_tokens and there
+        are at least 2 * keep verbatim loops, so roll-ups happen in batches
+        rather than once per loop when the summaries alone fill the budget.
+        """
+        return (self._block_chars // 4 > self.budget_tokens
+                and len(self._recent) >= 2 * self.keep)
+
+    def compact(self, now: Optional[datetime] = None):
+        """
+        Fold all but the last `keep` verbatim loops into hour buckets and
+        cascade old buckets up the tiers. Touches only loops logged since
+        the previous roll-up, plus the (bounded) summaries.
+        """
+        now = now or datetime.now()
+        r = self._rollup
+        fold = self._recent[:-self.keep] if self.keep else self._recent
+        if not fold:
+            return
+        for rec, size in fold:
+            r['offset'] += size
+            if 'loop' in rec:
+                self._add(rec)
+        self._recent = self._recent[len(fold):]
+
+        self._cascade('hours', 'days', now.strftime('%Y-%m-%d %H:00'), HOURS_KEPT)
+        self._cascade('days', 'weeks', now.strftime('%Y-%m-%d'), DAYS_KEPT)
+        self._cascade('weeks', None, now.strftime('%G-W%V'), WEEKS_KEPT)
+        _write_atomic(self.rollup_path, json.dumps(r))
+        self.render()
+
+    def _add(self, rec: dict):
+        text = rec.get('status') or rec.get('line', '')
+        bucket = {'from': rec['loop'], 'to': rec['loop'], 'count': 1,
+                  'events': _notable(text)[:EVENTS_PER_BUCKET]}
+        if 'ts' not in rec:
+            self._merge_earlier(bucket)  # imported, time unknown
+            return
+        self._merge_into('hours', TIER_KEYS['hours'](datetime.fromisoformat(rec['ts'])),
+                         bucket)
+
+    def _merge_into(self, tier: str, key: str, bucket: dict):
+        buckets = self._rollup[tier]
+        for b in buckets:
+            if b['key'] == key:
+                _merge(b, bucket)
+                return
+        buckets.append(dict(bucket, key=key))
+        buckets.sort(key=lambda b: b['key'])
+
+    def _merge_earlier(self, bucket: dict):
+        earlier = self._rollup['earlier']
+        if earlier is None:
+            self._rollup['earlier'] = {k: v for k, v in bucket.items() if k != 'key'}
+        else:
+            _merge(earlier, bucket)
+
+    def _cascade(self, tier: str, parent: Optional[str], current: str, kept: int):
+        """Move buckets of `tier` that are too many or too old up a level."""
+        buckets = self._rollup[tier]
+        keep_from = max(0, len(buckets) - kept)
+        moving = [b for i, b in enumerate(buckets)
+                  if i < keep_from and b['key'] != current]
+        if not moving:
+            return
+        self._rollup[tier] = [b for b in buckets if b not in moving]
+        for b in moving:
+            if parent is None:
+                self._merge_earlier(b)
+                continue
+            # Bucket keys parse back to the start of their period
+            if tier == 'hours':
+                start = datetime.strptime(b['key'], '%Y-%m-%d %H:00')
+            else:
+                start = datetime.strptime(b['key'], '%Y-%m-%d')
+            self._merge_into(parent, TIER_KEYS[parent](start),
+                             {k: v for k, v in b.items() if k != 'key'})
+
+    # ── Rendering ───────────────────────────────────────────────────
+
+    @staticmethod
+    def entry_line(rec: dict) -> str:
+        if 'line' in rec:
+            return rec['line']  # imported verbatim
+        ts = datetime.fromisoformat(rec['ts']).strftime('%I:%M %p %b %d')
+        return f"- Loop iteration #{rec['loop']} COMPLETE. {ts}. {rec['status']}"
+
+    def summary_lines(self) -> list:
+        """Summary lines, newest first: hours, then days, weeks, earlier."""
+        r = self._rollup
+        lines = []
+        for tier, label in (('hours', 'HOUR'), ('days', 'DAY'), ('weeks', 'WEEK')):
+            for b in reversed(r[tier]):
+                lines.append(self._summary(f"{label} {b['key']}", b))
+        if r['earlier']:
+            lines.append(self._summary('EARLIER', r['earlier']))
+        return lines
+
+    @staticmethod
+    def _summary(label: str, b: dict) -> str:
+        events = '; '.join(b['events']) or 'routine maintenance'
+        return (f"- [{label}: loops #{b['from']}-#{b['to']}, "
+                f"{b['count']} iterations] {events}")
+
+    def render(self):
+        """
+        Rewrite the loop block of wake-state.md from the log.
+
+        The loop block is the run of loop/summary lines right after the
+        '## Current Status: RUNNING' marker (or at the top of the file if
+        there is no marker); everything else is left as it was.
+        """
+        try:
+            with open(self.wake_state_path) as f:
+                lines = f.read().split('\n')
+        except OSError:
+            lines = []
+
+        start = lines.index(MARKER) + 1 if MARKER in lines else 0
+        end = start
+        legacy = []
+        while end < len(lines):
+            line = lines[end]
+            if line.startswith(LEGACY_PREFIX):
+                legacy.append(line)
+            elif not (ENTRY_RE.match(line) or line.startswith(SUMMARY_PREFIXES)
+                      or (line == '' and end + 1 < len(lines)
+                          and ENTRY_RE.match(lines[end + 1]))):
+                break
+            end += 1
+
+        block = ([self.entry_line(rec) for rec, _ in reversed(self._recent)
+                  if 'loop' in rec]
+                 + self.summary_lines() + legacy)
+        self._block_chars = sum(len(line) + 1 for line in block)
+        lines[start:end] = block
+        _write_atomic(self.wake_state_path, '\n'.join(lines))
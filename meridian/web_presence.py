@@ -48,11 +48,20 @@ class WebDeployer:
         return self.clone_path
 
     def copy_file(self, filename):
-        """Copy a file from source to the cloned repo."""
+        """Copy a file from source to the cloned repo.
+
+        A directory (e.g. 'writing') replaces its copy in the repo, so
+        pages removed locally are removed from the site too.
+        """
         src = self.source_dir / filename
         dst = self.clone_path / filename
         dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+        if src.is_dir():
+            if dst.exists():
+                shutil.rmtree(dst)
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
         return dst
 
     def copy_files(self, filenames):
@@ -64,13 +73,17 @@ class WebDeployer:
 
         Args:
             message: Commit message
-            files: List of filenames to copy from source_dir. Defaults to ['index.html']
+            files: List of files (or directories) to copy from source_dir.
+                Defaults to ['index.html'] plus the 'writing' directory
+                built by meridian.site_builder, when it exists.
 
         Returns:
             dict with commit hash and status
         """
         if files is None:
             files = ['index.html']
+            if (self.source_dir / 'writing').is_dir():
+                files.append('writing')
 
         self.clone()
         self.copy_files(files)
@@ -97,6 +110,10 @@ class WebDeployer:
         """Convenience method: deploy just index.html."""
         return self.deploy(message, files=['index.html'])
 
+    def deploy_writing(self, message):
+        """Deploy index.html (with its counts) and the writing/ pages."""
+        return self.deploy(message, files=['index.html', 'writing'])
+
     def deploy_with_game(self, message):
         """Deploy index.html and game.html together."""
         return self.deploy(message, files=['index.html', 'game.html'])